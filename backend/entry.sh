@@ -5,5 +5,8 @@ echo "Running Alembic migrations..."
 cd src
 alembic upgrade head
 
+echo "Notifying running instances about catalog changes..."
+python -m scripts.publish_catalogs || echo "Could not publish catalog changes, running instances keep their copies until restart"
+
 echo "Starting the application..."
 uvicorn main:app --host '0.0.0.0' --port 8080
@@ -29,4 +29,4 @@ async def list_users(
         limit=limit,
         cursor=cursor,
     )
-    return CursorPage(items=users, next_cursor=next_cursor)
+    return CursorPage(items=[svc.to_model(user) for user in users], next_cursor=next_cursor)
@@ -24,4 +24,4 @@ async def set_ban(
     if target is None:
         raise HTTPException(404, 'User not found')
     updated = await svc.admin_set_ban(target, banned=True)
-    return updated
+    return svc.to_model(updated)
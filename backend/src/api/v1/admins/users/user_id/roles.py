@@ -28,4 +28,4 @@ async def set_roles(
         raise HTTPException(status_code=404, detail="User not found")
 
     updated = await svc.admin_assign_roles(target, payload.roles)
-    return updated
+    return svc.to_model(updated)
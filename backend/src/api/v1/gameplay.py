@@ -1,11 +1,14 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from redis.asyncio import Redis
 
-from core.security import auth_user, require
+from core.security import auth_principal, require
 from core.config import settings
-from database.relational_db import User, get_uow, UoW, GamesInterface
+from database.redis import get_redis
+from database.relational_db import get_read_uow, UoW, GamesInterface
+from domain.auth import Principal
 from service.gameplay import (
     get_casino_service,
     get_profile_service,
@@ -14,6 +17,7 @@ from service.gameplay import (
     get_launch_service,
     LaunchService,
 )
+from service.gameplay.catalogs import game_catalog
 from domain.gameplay import (
     ProfilePatch,
     ProfileResponse,
@@ -22,24 +26,37 @@ from domain.gameplay import (
     MainResponse,
     BetRequest,
     SpinResponse,
+    BatchSpinRequest,
+    BatchSpinResponse,
     LeaderboardType,
     LeaderboardEntry,
+    LeaderboardPage,
     GameStartResponse,
     GameScoreRequest,
     GameScoreResponse,
     AdminRedeemRequest,
     AdminRedeemResponse,
+    AdminBatchRedeemRequest,
+    AdminBatchRedeemResponse,
     GameInfo,
+    InventoryPage,
+    InventoryGroup,
+    ItemStatus,
 )
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
 def get_gameplay_router() -> APIRouter:
     router = APIRouter(prefix="", tags=["Gameplay"])
 
     @router.post("/games/{game_id}/launch")
     async def launch_game(
         game_id: str,
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         launch_svc: Annotated[LaunchService, Depends(get_launch_service)],
     ):
         code, session_id = await launch_svc.create_launch(user, game_id)
@@ -47,18 +64,22 @@ def get_gameplay_router() -> APIRouter:
         return {"launch_url": launch_url, "session_id": session_id}
 
     @router.get("/games", response_model=list[GameInfo])
-    async def list_games(uow: Annotated[UoW, Depends(get_uow)]):
-        repo = GamesInterface(uow.session)
-        games = await repo.list()
-        return [
-            GameInfo(slug=g.slug, name=g.name, energy_cost=g.energy_cost)
-            for g in games
-        ]
+    async def list_games(
+        uow: Annotated[UoW, Depends(get_read_uow, scope="function")],
+        redis: Annotated[Redis, Depends(get_redis)],
+        if_none_match: str | None = Header(None),
+    ):
+        # The session only touches the database when the catalog has to reload
+        await game_catalog.ensure(redis, GamesInterface(uow.session))
+        headers = {"ETag": game_catalog.etag, "Cache-Control": "no-cache"}
+        if if_none_match and _etag_matches(if_none_match, game_catalog.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(game_catalog.body, media_type="application/json", headers=headers)
 
     # Profile
     @router.get("/profile/me", response_model=ProfileResponse)
     async def profile_me(
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_profile_service),
     ):
         return await svc.get_profile(user)
@@ -66,22 +87,40 @@ def get_gameplay_router() -> APIRouter:
     @router.patch("/profile/me", response_model=ProfileResponse)
     async def profile_patch(
         payload: ProfilePatch,
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_profile_service),
     ):
         return await svc.patch_profile(payload, user)
 
+    @router.get("/profile/inventory", response_model=InventoryPage)
+    async def profile_inventory(
+        user: Annotated[Principal, Depends(auth_principal)],
+        status: ItemStatus = Query(ItemStatus.AVAILABLE, description="Item status to list"),
+        limit: int = Query(50, ge=1, le=100, description="Page size"),
+        cursor: str | None = Query(None, description="Opaque cursor"),
+        svc=Depends(get_profile_service),
+    ):
+        return await svc.get_inventory(user, status=status, limit=limit, cursor=cursor)
+
+    @router.get("/profile/inventory/grouped", response_model=list[InventoryGroup])
+    async def profile_inventory_grouped(
+        user: Annotated[Principal, Depends(auth_principal)],
+        status: ItemStatus | None = Query(None, description="Only count items with this status"),
+        svc=Depends(get_profile_service),
+    ):
+        return await svc.get_inventory_groups(user, status=status)
+
     @router.post("/profile/inventory/{item_id}/code", response_model=RedeemTokenResponse)
     async def inventory_code(
         item_id: UUID,
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_casino_service),
     ):
         return await svc.generate_redeem_token(item_id, user)
 
     @router.get("/profile/balance", response_model=Balance)
     async def profile_balance(
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_profile_service),
     ):
         return await svc.balance(user)
@@ -89,7 +128,7 @@ def get_gameplay_router() -> APIRouter:
     # Main
     @router.get("/main", response_model=MainResponse)
     async def main(
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_profile_service),
     ):
         return await svc.main(user)
@@ -98,24 +137,51 @@ def get_gameplay_router() -> APIRouter:
     @router.post("/casino/spin", response_model=SpinResponse)
     async def casino_spin(
         bet: BetRequest,
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_casino_service),
     ):
         return await svc.spin(bet, user)
 
+    @router.post("/casino/spin/batch", response_model=BatchSpinResponse)
+    async def casino_spin_batch(
+        payload: BatchSpinRequest,
+        user: Annotated[Principal, Depends(auth_principal)],
+        svc=Depends(get_casino_service),
+    ):
+        return await svc.spin_batch(payload, user)
+
     # Leaderboard
     @router.get("/leaderboard", response_model=list[LeaderboardEntry])
     async def leaderboard(
         type: LeaderboardType,
+        limit: int = Query(100, ge=1, le=100, description="Number of top entries"),
+        svc=Depends(get_leaderboard_service),
+    ):
+        return await svc.get(type, limit=limit)
+
+    @router.get("/leaderboard/page", response_model=LeaderboardPage)
+    async def leaderboard_page(
+        type: LeaderboardType,
+        limit: int = Query(50, ge=1, le=100, description="Page size"),
+        cursor: str | None = Query(None, description="Opaque cursor"),
+        svc=Depends(get_leaderboard_service),
+    ):
+        return await svc.get_page(type, limit=limit, cursor=cursor)
+
+    @router.get("/leaderboard/me", response_model=LeaderboardPage)
+    async def leaderboard_me(
+        type: LeaderboardType,
+        user: Annotated[Principal, Depends(auth_principal)],
+        around_me: int = Query(5, ge=0, le=50, description="Neighbours above and below the caller"),
         svc=Depends(get_leaderboard_service),
     ):
-        return await svc.get(type)
+        return await svc.around(type, user, around_me)
 
     # Game
     @router.post("/game/{game_id}/start", response_model=GameStartResponse)
     async def game_start(
         game_id: str,
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_profile_service),
     ):
         return await svc.apply_game_start(user, game_id=game_id)
@@ -123,7 +189,7 @@ def get_gameplay_router() -> APIRouter:
     @router.post("/game/score", response_model=GameScoreResponse)
     async def game_score(
         payload: GameScoreRequest,
-        user: Annotated[User, Depends(auth_user)],
+        user: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_profile_service),
     ):
         return await svc.apply_game_score(user, payload)
@@ -136,8 +202,21 @@ def get_gameplay_router() -> APIRouter:
     )
     async def redeem_prize(
         payload: AdminRedeemRequest,
+        admin: Annotated[Principal, Depends(auth_principal)],
+        svc=Depends(get_admin_service),
+    ):
+        return await svc.redeem(payload.redeem_token, actor_id=admin.id)
+
+    @router.post(
+        "/admin/prizes/redeem/batch",
+        response_model=AdminBatchRedeemResponse,
+        dependencies=[Depends(require("admin"))],
+    )
+    async def redeem_prize_batch(
+        payload: AdminBatchRedeemRequest,
+        admin: Annotated[Principal, Depends(auth_principal)],
         svc=Depends(get_admin_service),
     ):
-        return await svc.redeem(payload.redeem_token)
+        return await svc.redeem_batch(payload.redeem_tokens, actor_id=admin.id)
 
     return router
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import render_metrics
+from core.security import require
 
 
 def get_misc_router() -> APIRouter:
@@ -8,4 +12,13 @@ def get_misc_router() -> APIRouter:
 
     # router.include_router(get_languages_router())
 
+    @router.get(
+        "/metrics",
+        response_class=PlainTextResponse,
+        dependencies=[Depends(require("admin"))],
+        tags=["Misc"],
+    )
+    async def metrics():
+        return render_metrics()
+
     return router
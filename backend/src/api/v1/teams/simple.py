@@ -4,7 +4,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from core.security import auth_user
-from database.relational_db import get_uow, UoW, TeamsInterface, User
+from database.relational_db import get_uow, get_read_uow, UoW, TeamsInterface, User
 from domain.users import TeamModel, TeamJoinRequest
 from service.users import UserService, get_user_service
 
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/teams", tags=["Teams"])
 
 @router.get("/", response_model=list[TeamModel])
 async def list_teams(
-    uow: Annotated[UoW, Depends(get_uow)],
+    uow: Annotated[UoW, Depends(get_read_uow, scope="function")],
 ):
     teams_repo = TeamsInterface(uow.session)
     teams = await teams_repo.list()
@@ -32,7 +32,7 @@ async def list_teams(
 async def join_team(
     payload: TeamJoinRequest,
     user: Annotated[User, Depends(auth_user)],
-    uow: Annotated[UoW, Depends(get_uow)],
+    uow: Annotated[UoW, Depends(get_uow, scope="function")],
     svc: Annotated[UserService, Depends(get_user_service)],
 ):
     teams_repo = TeamsInterface(uow.session)
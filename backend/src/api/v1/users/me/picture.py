@@ -22,4 +22,4 @@ async def update_profile(
     svc: Annotated[UserService, Depends(get_user_service)],
 ):
     await svc.add_picture(file, user)
-    return user
+    return svc.to_model(user)
@@ -17,9 +17,9 @@ async def profile(
     user: Annotated[User, Depends(auth_user)],
     # TODO: Add expandable fields
     # expand: Annotated[list[ExpandUserFields], Query(default_factory=list, description="Fields to expand with in the response")],
-    # svc: Annotated[UserService, Depends(get_user_service)],
+    svc: Annotated[UserService, Depends(get_user_service)],
 ):
-    return user
+    return svc.to_model(user)
 
 
 @router.patch(
@@ -33,4 +33,4 @@ async def update_profile(
     svc: Annotated[UserService, Depends(get_user_service)],
 ):
     await svc.patch_user(payload, user)
-    return user
+    return svc.to_model(user)
@@ -1,6 +1,7 @@
 import logging
 
 from pathlib import Path
+from typing import Literal
 from pydantic import SecretStr
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -19,6 +20,7 @@ class Settings(BaseSettings):
     # API settings
     API_PORT: int = 8080
     API_HOST: str = '0.0.0.0'
+    DEBUG: bool = False
     
     # Site data (url, paths)
     SITE_URL: str = ''
@@ -30,20 +32,46 @@ class Settings(BaseSettings):
     # Auth Settings    
     JWT_PRIVATE_KEY: str
     JWT_PUBLIC_KEY: str
-    JWT_ALGO: str = 'RS256'
+    JWT_ALGO: str = 'RS256' # RS256, ES256 or EdDSA, must match the key type
+    JWT_KID: str = 'primary'
+    JWT_PREVIOUS_PUBLIC_KEYS: dict[str, str] = {} # kid -> PEM, still accepted during rollover
     ACCESS_TTL: int = 60 * 15
     REFRESH_TTL: int = 60 * 60 * 24 * 7
     CSRF_HMAC_KEY: bytes
+    TOKEN_CACHE_SIZE: int = 10_000
+    BLOCKLIST_SYNC_SECONDS: int = 5
+    HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    HASH_WORKERS: int = 2 # concurrent argon2 hashes, 64 MiB each
+    HASH_QUEUE_LIMIT: int = 16 # waiting hashes before new ones get 503
+    HASH_RETRY_AFTER: int = 2 # seconds
     
     # Database settings
     DATABASE_URL: str
     REDIS_URL: str
+    DATABASE_REPLICA_URL: str = '' # read-only endpoints use it when set
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_LAG_CHECK_SECONDS: int = 5
+    DB_ECHO: bool = False # logs every statement, local debugging only
+    QUERY_PROFILING: bool = False # per-request statement count and DB time
+    SLOW_QUERY_MS: int = 200
+    # Per uvicorn worker, total connections = workers * (size + overflow)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30 # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800 # seconds, -1 keeps connections forever
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     # Gameplay
     GAME_URL: str = "https://lapcevichme.github.io/WinterHackathon/"
     GAME_ENERGY_COST: int = 1
     INITIAL_ENERGY: int = 10
     INITIAL_BALANCE: int = 500
+    LEADERBOARD_SNAPSHOT_MINUTES: int = 60
+    REDEEM_TOKEN_TTL_SECONDS: int = 300
+    REDEEM_AUDIT_FLUSH_SECONDS: int = 10
+    REDEEM_AUDIT_BATCH: int = 500
+    REDEEM_AUDIT_LOCK_SECONDS: int = 60
 
 settings = Settings()
 
@@ -1,6 +1,18 @@
 import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal, TypeVar
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from core.config import Settings
+from core.metrics import Counter, Histogram
+
+config = Settings()  # pyright: ignore[reportCallIssue]
+T = TypeVar("T")
+
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
@@ -10,11 +22,110 @@ pwd_context = CryptContext(
     argon2__parallelism=2,
 )
 
+# Every argon2 call holds 64 MiB, so hashing gets its own small pool
+# instead of the default executor shared with the rest of the app.
+# Created by start_hashing() at startup, or lazily as a thread pool.
+_executor: Executor | None = None
+_workers = config.HASH_WORKERS
+_in_flight = 0
+
+hash_queue_wait = Histogram("password_hash_queue_wait_seconds", "Time a hash waited for a free worker")
+hash_duration = Histogram("password_hash_duration_seconds", "Time spent computing a password hash")
+hash_rejected = Counter("password_hash_rejected", "Hashes rejected because the queue was full")
+
+
+class HashingOverloaded(HTTPException):
+    def __init__(self, *args, **kwargs):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Too many sign-in attempts right now, try again shortly',
+            headers={'Retry-After': str(config.HASH_RETRY_AFTER)},
+        )
+
+
+# Worker-side functions live at module level so process pools can pickle them
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+def _needs_update(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+def _warm() -> None:
+    # Loads the argon2 backend so the first real hash doesn't pay for imports
+    pwd_context.handler().get_backend()
+
+def _timed(fn: Callable[..., T], *args) -> tuple[float, float, T]:
+    # Wall clock, so queue wait is comparable across processes
+    started = time.time()
+    result = fn(*args)
+    return started, time.time() - started, result
+
+
+def _make_executor(kind: Literal["thread", "process"], workers: int) -> Executor:
+    if kind == "process":
+        # spawn: forking a process with a running event loop and open sockets is unsafe
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+
+
+async def start_hashing(
+    kind: Literal["thread", "process"] | None = None,
+    workers: int | None = None,
+) -> None:
+    """Creates the hashing pool and starts every worker up front"""
+    global _executor, _workers
+    await stop_hashing()
+    _workers = workers or config.HASH_WORKERS
+    _executor = _make_executor(kind or config.HASH_EXECUTOR, _workers)
+
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(_executor, _warm) for _ in range(_workers)))
+
+
+async def stop_hashing() -> None:
+    global _executor
+    if _executor is not None:
+        executor, _executor = _executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        _executor = _make_executor("thread", _workers)
+    return _executor
+
+
+async def _run_hashing(fn: Callable[..., T], *args) -> T:
+    global _in_flight
+    if _in_flight >= _workers + config.HASH_QUEUE_LIMIT:
+        hash_rejected.inc()
+        raise HashingOverloaded()
+
+    submitted = time.time()
+    _in_flight += 1
+    try:
+        started, duration, result = await asyncio.get_running_loop().run_in_executor(
+            _get_executor(), _timed, fn, *args
+        )
+    finally:
+        _in_flight -= 1
+
+    hash_queue_wait.observe(max(started - submitted, 0.0))
+    hash_duration.observe(duration)
+    return result
+
+
 async def hash_password(password: str) -> str:
-    return await asyncio.to_thread(pwd_context.hash, password)
+    return await _run_hashing(_hash, password)
 
 async def verify_password(password: str, hashed_password: str) -> bool:
-    return await asyncio.to_thread(pwd_context.verify, password, hashed_password)
+    return await _run_hashing(_verify, password, hashed_password)
 
 async def needs_rehash(hashed_password: str) -> bool:
-    return await asyncio.to_thread(pwd_context.needs_update, hashed_password)
+    # Only parses the hash parameters, cheap enough for the event loop
+    return _needs_update(hashed_password)
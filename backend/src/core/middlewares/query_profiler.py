@@ -0,0 +1,67 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import Histogram
+from database.relational_db.profiling import QueryProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+db_queries = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per request",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+db_checkouts = Histogram(
+    "db_checkouts_per_request",
+    "Pooled connections checked out per request",
+    buckets=(0, 1, 2, 3, 5),
+)
+db_time = Histogram("db_time_per_request_seconds", "Total time spent in SQL per request")
+db_slowest = Histogram("db_slowest_query_seconds", "Slowest SQL statement of each request")
+
+
+class QueryProfilerMiddleware:
+    """
+    Collects per-request SQL stats. In debug mode they are returned as
+    X-DB-* response headers, otherwise only aggregated into histograms.
+    Queries made after the response started (request-scoped dependency
+    teardown) are only in the histograms.
+    """
+    def __init__(self, app: ASGIApp, debug: bool = False, slow_query_ms: int = 200):
+        self.app = app
+        self.debug = debug
+        self.slow_query = slow_query_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(profile.count)
+                headers["X-DB-Checkouts"] = str(profile.checkouts)
+                headers["X-DB-Time-Ms"] = f"{profile.total * 1000:.1f}"
+                headers["X-DB-Slowest-Ms"] = f"{profile.slowest * 1000:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers if self.debug else send)
+        finally:
+            current_profile.reset(token)
+            db_queries.observe(profile.count)
+            db_checkouts.observe(profile.checkouts)
+            db_time.observe(profile.total)
+            if profile.count:
+                db_slowest.observe(profile.slowest)
+            if profile.slowest >= self.slow_query:
+                logger.warning(
+                    "Slow query on %s %s (%.1f ms): %s",
+                    scope["method"], scope["path"], profile.slowest * 1000, profile.slowest_statement,
+                )
@@ -2,6 +2,8 @@ from uuid import UUID
 
 PERMISSIONS_CACHE_TTL_SECONDS = 900 # 15 minutes
 ROLES_CACHE_TTL_SECONDS = 900 # 15 minutes
+PRINCIPAL_CACHE_TTL_SECONDS = 900 # 15 minutes
+PRINCIPAL_LOCAL_TTL_SECONDS = 5 # in-process copy, bounds staleness across workers
 
 
 def permissions_cache_key(user_id: UUID | str, version: int) -> str:
@@ -9,6 +11,12 @@ def permissions_cache_key(user_id: UUID | str, version: int) -> str:
 
 def roles_cache_key(user_id: UUID | str, version: int) -> str:
     return f"auth:roles:{user_id}:v{version}"
+
+def principal_cache_key(user_id: UUID | str, version: int) -> str:
+    return f"auth:principal:{user_id}:v{version}"
+
+def principal_stamp_key(user_id: UUID | str) -> str:
+    return f"auth:principal:{user_id}:stamp"
  
  
 GLOBAL_ROLE_IMPLICATIONS = {
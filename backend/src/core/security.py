@@ -1,4 +1,3 @@
-import json
 from typing import Annotated, Literal
 
 import jwt
@@ -6,14 +5,11 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from core.rbac import (
-    ROLES_CACHE_TTL_SECONDS, 
-    roles_cache_key,
     GLOBAL_ROLE_IMPLICATIONS,
     TEAM_ROLE_IMPLICATIONS,
 )
-from database.redis import CacheRepo, get_redis
 from database.relational_db import User
-from domain.auth import SystemPermission, SystemRole
+from domain.auth import Principal, SystemRole
 from service.auth import TokenService, get_token_service
 from service.users import UserService, get_user_service
 # from service.organizations import OrganizationService, get_organization_service
@@ -54,38 +50,44 @@ async def parse_token(
     
     return payload
 
+async def auth_principal(
+    payload: Annotated[dict[str, int | str], Depends(parse_token)],
+    svc: Annotated[UserService, Depends(get_user_service)],
+) -> Principal:
+    """Resolves the caller from cache without loading the full user row"""
+    token_version = payload.get("av")
+    principal = await svc.get_principal(
+        str(payload["sub"]),
+        int(token_version) if token_version is not None else None,
+    )
+    if principal is None:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Not Authorized")
+    ensure_not_banned(principal)
+    return principal
+
+
 async def auth_user(
     payload: Annotated[dict[str, int | str], Depends(parse_token)],
     svc: Annotated[UserService, Depends(get_user_service)],
 ) -> User:
-    user_id = str(payload["sub"])
-    user = await svc.get_user(user_id)
+    """Loads the caller's full row, the ban check runs on it instead of a separate principal lookup"""
+    user = await svc.get_user(str(payload["sub"]))
     if user is None:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Not Authorized")
-    if user.banned:
+    ensure_not_banned(user)
+    return user
+
+
+def ensure_not_banned(principal: Principal | User) -> None:
+    if principal.banned:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="Your account is banned, contact support: laughinmee@gmail.com",
         )
 
-    return user
 
-
-async def load_cached_roles(user: User) -> list[str]:
-    cache_repo = CacheRepo(get_redis())
-
-    roles = await cache_repo.get(roles_cache_key(user.id, user.auth_version))
-    
-    if roles is not None:
-        return json.loads(roles)
-    
-    roles_slugs = user.role_slugs
-    await cache_repo.set(roles_cache_key(user.id, user.auth_version), json.dumps(roles_slugs), ttl=ROLES_CACHE_TTL_SECONDS)
-
-    return roles_slugs
-
-def verify_auth_version(token_version: int | str | None, user: User) -> None:
-    if token_version is None or int(token_version) != int(user.auth_version):
+def verify_auth_version(token_version: int | str | None, principal: Principal | User) -> None:
+    if token_version is None or int(token_version) != int(principal.auth_version):
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Access token expired, please sign in again")
 
 
@@ -118,14 +120,13 @@ def require(
     async def dependency(
         request: Request,
         payload: Annotated[dict[str, int | str], Depends(parse_token)],
-        user: Annotated[User, Depends(auth_user)],
+        principal: Annotated[Principal, Depends(auth_principal)],
         # org_svc: Annotated[OrganizationService, Depends(get_organization_service)],
     ) -> None:
         
-        verify_auth_version(payload.get("av"), user)
+        verify_auth_version(payload.get("av"), principal)
         
-        global_roles = await load_cached_roles(user)
-        eff_roles = expand_roles(list(global_roles), GLOBAL_ROLE_IMPLICATIONS)
+        eff_roles = expand_roles(principal.role_slugs, GLOBAL_ROLE_IMPLICATIONS)
         
         if eff_roles & bypass_global:
             return
@@ -152,46 +153,3 @@ def require(
         #         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="You don't have permission to do this")
 
     return dependency
-
-
-# async def _resolve_permissions(
-#     user: User,
-#     cache_repo: CacheRepo,
-# ) -> set[str]:
-#     cache_key = permissions_cache_key(user.id, user.auth_version)
-#     cached = await cache_repo.get(cache_key)
-#     if cached:
-#         try:
-#             return set(json.loads(cached))
-#         except json.JSONDecodeError:
-#             await cache_repo.delete(cache_key)
-
-#     permissions = set(user.permission_slugs)
-#     if permissions:
-#         await cache_repo.set(
-#             cache_key,
-#             json.dumps(sorted(permissions)),
-#             ttl=PERMISSIONS_CACHE_TTL_SECONDS,
-#         )
-#     return permissions
-
-
-# def require_permissions(*permissions: SystemPermission | str):
-#     expected = {
-#         perm.value if isinstance(perm, SystemPermission) else str(perm)
-#         for perm in permissions
-#     }
-
-#     async def dependency(
-#         user: Annotated[User, Depends(auth_user)],
-#     ) -> User:
-#         cache_repo = CacheRepo(get_redis())
-#         granted = await _resolve_permissions(user, cache_repo)
-#         if not expected.issubset(granted):
-#             raise HTTPException(
-#                 status.HTTP_403_FORBIDDEN,
-#                 detail="You don't have permission to do this",
-#             )
-#         return user
-
-#     return dependency
@@ -1,2 +1,5 @@
 from .redis_client import get_redis
 from .cache_interface import CacheRepo
+from .leaderboard_interface import LeaderboardRepo
+from .blocklist_interface import BlocklistRepo
+from .redeem_interface import RedeemTokenRepo
@@ -0,0 +1,33 @@
+import time
+from redis.asyncio import Redis
+
+
+class BlocklistRepo():
+    """
+    Blocked token JTIs. Each JTI has its own `block:{jti}` key for exact checks
+    that lives as long as the token. JTIs are also indexed in a sorted set scored
+    by block time, kept only for `index_seconds`, so workers can sync recent blocks in bulk.
+    """
+    INDEX_KEY = "block:index"
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def _key(jti: str) -> str:
+        return f"block:{jti}"
+
+    async def block(self, jti: str, ttl: int, index_seconds: int) -> None:
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(jti), "1", ex=max(ttl, 1))
+            pipe.zadd(self.INDEX_KEY, {jti: now})
+            pipe.zremrangebyscore(self.INDEX_KEY, "-inf", now - index_seconds)
+            await pipe.execute()
+
+    async def is_blocked(self, jti: str) -> bool:
+        return bool(await self.redis.exists(self._key(jti)))
+
+    async def blocked_since(self, since: float) -> list[tuple[str, float]]:
+        """Returns (jti, blocked_at) of JTIs indexed at or after `since`"""
+        return await self.redis.zrangebyscore(self.INDEX_KEY, since, "+inf", withscores=True)
@@ -1,9 +1,19 @@
 from redis.asyncio import Redis
 
+# Writes KEYS[1] only while the guard KEYS[2] still holds the stamp the caller read
+SET_IF_STAMP = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
 
 class CacheRepo():
     def __init__(self, redis: Redis):
         self.redis = redis
+        self._set_if_stamp = redis.register_script(SET_IF_STAMP)
         
     async def set(self, name: str, value: str, ttl: int | None = None) -> None:
         await self.redis.set(name, value, ex=ttl)
@@ -19,3 +29,27 @@ class CacheRepo():
         
     async def exists(self, *names) -> int:
         return await self.redis.exists(*names)
+
+    async def get_stamped(self, name: str, guard: str) -> tuple[str | None, str]:
+        """Returns the cached value and the current stamp of its guard key in one round trip"""
+        value, stamp = await self.redis.mget(name, guard)
+        return value, stamp or "0"
+
+    async def stamp(self, guard: str) -> str:
+        return await self.redis.get(guard) or "0"
+
+    async def set_if_stamp(self, name: str, value: str, guard: str, stamp: str, ttl: int) -> bool:
+        """
+        Caches the value unless the guard was bumped since `stamp` was read,
+        i.e. unless the value may have been loaded before an invalidation
+        """
+        return bool(await self._set_if_stamp(keys=[name, guard], args=[stamp, value, ttl]))
+
+    async def bump_stamp(self, guard: str, ttl: int, *names: str) -> None:
+        """Deletes the cached values and bumps the guard so in-flight loads can't write them back"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.incr(guard)
+            pipe.expire(guard, ttl)
+            if names:
+                pipe.delete(*names)
+            await pipe.execute()
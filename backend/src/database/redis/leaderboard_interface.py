@@ -0,0 +1,191 @@
+import secrets
+from typing import Iterable
+from redis.asyncio import Redis
+
+
+# KEYS: board, names, rebuild lock, board being built, names being built.
+# Writes the total to the cached board if it exists and to the copy being
+# built if a rebuild is running, so it survives the swap
+SET_SCORE = """
+local applied = 0
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('ZADD', KEYS[1], 'GT', ARGV[2], ARGV[1])
+    if ARGV[3] then
+        redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+    end
+    applied = 1
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    redis.call('ZADD', KEYS[4], 'GT', ARGV[2], ARGV[1])
+    if ARGV[3] then
+        redis.call('HSET', KEYS[5], ARGV[1], ARGV[3])
+    end
+    applied = 1
+end
+return applied
+"""
+
+# KEYS: names, rebuild lock, names being built
+SET_NAME = """
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('HSET', KEYS[3], ARGV[1], ARGV[2])
+end
+"""
+
+# KEYS: board, names, rebuild lock, board being built, names being built.
+# Swaps the built copy in, only for the rebuild that still holds the lock
+FINISH_REBUILD = """
+if redis.call('GET', KEYS[3]) ~= ARGV[1] then
+    return 0
+end
+if redis.call('EXISTS', KEYS[4]) == 1 then
+    redis.call('RENAME', KEYS[4], KEYS[1])
+else
+    redis.call('DEL', KEYS[1])
+end
+if redis.call('EXISTS', KEYS[5]) == 1 then
+    redis.call('RENAME', KEYS[5], KEYS[2])
+else
+    redis.call('DEL', KEYS[2])
+end
+redis.call('DEL', KEYS[3])
+return 1
+"""
+
+# KEYS: rebuild lock, board being built, names being built
+ABORT_REBUILD = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+return redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+"""
+
+
+class LeaderboardRepo():
+    """Leaderboard scores stored in Redis sorted sets, one set per board"""
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._set_score = redis.register_script(SET_SCORE)
+        self._set_name = redis.register_script(SET_NAME)
+        self._finish_rebuild = redis.register_script(FINISH_REBUILD)
+        self._abort_rebuild = redis.register_script(ABORT_REBUILD)
+
+    @staticmethod
+    def _key(board: str) -> str:
+        return f"lb:{board}"
+
+    @staticmethod
+    def _names_key(board: str) -> str:
+        return f"lb:{board}:names"
+
+    def _keys(self, board: str) -> list[str]:
+        """board, names, rebuild lock, board being built, names being built"""
+        key, names_key = self._key(board), self._names_key(board)
+        return [key, names_key, f"{key}:rebuilding", f"{key}:tmp", f"{names_key}:tmp"]
+
+    async def exists(self, board: str) -> bool:
+        return bool(await self.redis.exists(self._key(board)))
+
+    async def size(self, board: str) -> int:
+        return await self.redis.zcard(self._key(board))
+
+    async def set_score(self, board: str, member: str, score: int, name: str | None = None) -> bool:
+        """
+        Raises the member's total to `score` (never lowers it) if the board is
+        cached or being rebuilt. A missing board is left missing so it gets
+        rebuilt with everyone's totals instead of just this member.
+        """
+        args = [member, score] if name is None else [member, score, name]
+        return bool(await self._set_score(keys=self._keys(board), args=args))
+
+    async def set_name(self, board: str, member: str, name: str) -> None:
+        key, names_key, lock_key, _, tmp_names_key = self._keys(board)
+        await self._set_name(keys=[names_key, lock_key, tmp_names_key], args=[member, name])
+
+    async def begin_rebuild(self, board: str, ttl: int) -> str | None:
+        """
+        Takes the board's rebuild lock and starts an empty copy that `set_score`
+        writes to from now on. Returns the lock token, None if another rebuild runs.
+        """
+        _, _, lock_key, tmp_key, tmp_names_key = self._keys(board)
+        token = secrets.token_hex(16)
+        if not await self.redis.set(lock_key, token, nx=True, ex=ttl):
+            return None
+        await self.redis.delete(tmp_key, tmp_names_key)
+        return token
+
+    async def finish_rebuild(self, board: str, token: str, rows: Iterable[tuple[str, str, int]]) -> bool:
+        """
+        Merges the rows loaded from Postgres into the copy and swaps it in.
+        Totals recorded since `begin_rebuild` win over the loaded ones, so nothing
+        written between the SELECT and the swap is lost.
+        """
+        keys = self._keys(board)
+        _, _, _, tmp_key, tmp_names_key = keys
+        scores: dict[str, int] = {}
+        names: dict[str, str] = {}
+        for member, name, score in rows:
+            scores[member] = score
+            names[member] = name
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if scores:
+                pipe.zadd(tmp_key, scores, gt=True)
+            for member, name in names.items():
+                pipe.hsetnx(tmp_names_key, member, name)
+            await self._finish_rebuild(keys=keys, args=[token], client=pipe)
+            *_, swapped = await pipe.execute()
+        return bool(swapped)
+
+    async def abort_rebuild(self, board: str, token: str) -> None:
+        _, _, lock_key, tmp_key, tmp_names_key = self._keys(board)
+        await self._abort_rebuild(keys=[lock_key, tmp_key, tmp_names_key], args=[token])
+
+    async def page(
+        self,
+        board: str,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[tuple[str, str | None, int, int]]:
+        """
+        Returns (member, name, score, rank) tuples ordered by score desc.
+        Ties share the same rank, like SQL RANK().
+        """
+        key = self._key(board)
+        stop = -1 if limit is None else offset + limit - 1
+        rows = await self.redis.zrevrange(key, offset, stop, withscores=True)
+        if not rows:
+            return []
+
+        members = [member for member, _ in rows]
+        top_score = int(rows[0][1])
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcount(key, f"({top_score}", "+inf")
+            pipe.hmget(self._names_key(board), members)
+            higher, names = await pipe.execute()
+
+        result = []
+        rank = higher + 1
+        prev_score = top_score
+        for pos, ((member, score), name) in enumerate(zip(rows, names)):
+            score = int(score)
+            if score != prev_score:
+                rank = offset + pos + 1
+                prev_score = score
+            result.append((member, name, score, rank))
+        return result
+
+    async def rank_of(self, board: str, member: str) -> tuple[int, int, int] | None:
+        """Returns (position, rank, score) of a member or None when it is not on the board"""
+        key = self._key(board)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrank(key, member)
+            pipe.zscore(key, member)
+            position, score = await pipe.execute()
+        if position is None or score is None:
+            return None
+
+        score = int(score)
+        higher = await self.redis.zcount(key, f"({score}", "+inf")
+        return position, higher + 1, score
@@ -0,0 +1,93 @@
+import json
+import secrets
+from redis.asyncio import Redis
+
+# Hands out the batch left in the processing list by a run that never
+# acknowledged it, otherwise moves up to ARGV[1] new events there
+CLAIM_AUDIT = """
+local batch = redis.call('LRANGE', KEYS[2], 0, -1)
+if #batch > 0 then
+    return batch
+end
+for i = 1, tonumber(ARGV[1]) do
+    local event = redis.call('LMOVE', KEYS[1], KEYS[2], 'LEFT', 'RIGHT')
+    if not event then
+        break
+    end
+    batch[i] = event
+end
+return batch
+"""
+
+# Deletes the lock only if it is still the caller's
+RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedeemTokenRepo():
+    """
+    Single-use prize redeem tokens. Each token is a `redeem:{token}` key that
+    expires on its own and is consumed with GETDEL, so a token can't be redeemed twice.
+    Issue/redeem events are queued on a list and copied to Postgres in the background.
+    """
+    AUDIT_KEY = "redeem:audit"
+    AUDIT_PROCESSING_KEY = "redeem:audit:processing"
+    AUDIT_LOCK_KEY = "redeem:audit:lock"
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._claim_audit = redis.register_script(CLAIM_AUDIT)
+        self._release_lock = redis.register_script(RELEASE_LOCK)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return f"redeem:{token}"
+
+    async def issue(self, token: str, payload: dict, ttl: int, audit: dict) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(token), json.dumps(payload), ex=ttl)
+            pipe.rpush(self.AUDIT_KEY, json.dumps(audit))
+            await pipe.execute()
+
+    async def take(self, token: str) -> dict | None:
+        """Returns the token payload and deletes it, None if unknown or expired"""
+        raw = await self.redis.getdel(self._key(token))
+        return json.loads(raw) if raw else None
+
+    async def take_many(self, tokens: list[str]) -> list[dict | None]:
+        """`take` for every token in one round trip, results in the same order"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for token in tokens:
+                pipe.getdel(self._key(token))
+            raw = await pipe.execute()
+        return [json.loads(item) if item else None for item in raw]
+
+    async def audit(self, *events: dict) -> None:
+        if events:
+            await self.redis.rpush(self.AUDIT_KEY, *(json.dumps(event) for event in events))
+
+    async def lock_audit(self, ttl: int) -> str | None:
+        """Returns the lock token if no other flusher holds the lock, None otherwise"""
+        token = secrets.token_hex(16)
+        return token if await self.redis.set(self.AUDIT_LOCK_KEY, token, nx=True, ex=ttl) else None
+
+    async def unlock_audit(self, token: str) -> None:
+        await self._release_lock(keys=[self.AUDIT_LOCK_KEY], args=[token])
+
+    async def claim_audit(self, limit: int) -> list[dict]:
+        """
+        Moves a batch of events to the processing list and returns it.
+        The batch stays there until `ack_audit`, so a run that dies before
+        the insert commits hands the same events to the next run.
+        Only call it while holding `lock_audit`, every caller gets the same batch.
+        """
+        raw = await self._claim_audit(keys=[self.AUDIT_KEY, self.AUDIT_PROCESSING_KEY], args=[limit])
+        return [json.loads(item) for item in raw or []]
+
+    async def ack_audit(self) -> None:
+        """Drops the claimed batch once it is safely in Postgres"""
+        await self.redis.delete(self.AUDIT_PROCESSING_KEY)
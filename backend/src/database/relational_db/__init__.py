@@ -2,11 +2,12 @@ from .tables import *
 from .tables.gameplay_interfaces import (
     PrizesInterface,
     InventoryInterface,
-    TokenQRInterface,
+    RedeemAuditInterface,
     GameSessionInterface,
     TeamsInterface,
     LaunchCodeInterface,
     GamesInterface,
+    LeaderboardInterface,
 )
-from .session import get_uow
+from .session import get_uow, get_read_uow, new_uow
 from .unit_of_work import UoW
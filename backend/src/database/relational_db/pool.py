@@ -0,0 +1,40 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from core.metrics import Counter, Gauge, Histogram
+from .profiling import current_profile
+
+pool_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+pool_timeouts = Counter("db_pool_checkout_timeouts", "Checkouts that hit DB_POOL_TIMEOUT")
+pool_checkouts = Counter("db_pool_checkouts", "Connections handed out by the pool")
+
+
+class MeteredPool(AsyncAdaptedQueuePool):
+    """Queue pool that counts checkouts and records how long they wait for a free connection"""
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeout:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait.observe(time.perf_counter() - started)
+
+        pool_checkouts.inc()
+        profile = current_profile.get()
+        if profile is not None:
+            profile.checkouts += 1
+        return record
+
+
+def register_pool_gauges(pool: MeteredPool) -> None:
+    Gauge("db_pool_size", "Configured pool size", lambda: pool.size())
+    Gauge("db_pool_checked_out", "Connections currently in use", lambda: pool.checkedout())
+    Gauge("db_pool_overflow", "Connections open beyond the pool size", lambda: max(pool.overflow(), 0))
@@ -0,0 +1,71 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class StatementCounter:
+    """Collects SQL statements executed on an engine while the context is active"""
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine.sync_engine
+        self.statements: list[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        self.statements.clear()
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *_):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+class QueryProfile:
+    """Statement count and timings of the queries run while handling one request"""
+    __slots__ = ("count", "checkouts", "total", "slowest", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.checkouts = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: str | None = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        # Kept on the execution context, so failed statements leave nothing behind
+        context._profiler_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    started = getattr(context, "_profiler_started", None)
+    if profile is None or started is None:
+        return
+    profile.record(statement, time.perf_counter() - started)
+
+
+def install_query_profiler(engine: AsyncEngine) -> None:
+    """Times every statement on the engine into the active request's QueryProfile"""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_execute)
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import Settings
+from core.metrics import Gauge
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received, so an idle primary
+# does not look like lag
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaLagCheck:
+    """Replication lag of the replica, re-measured at most every REPLICA_LAG_CHECK_SECONDS"""
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.lag: float | None = None
+        self.checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def _measure(self) -> float | None:
+        try:
+            async with self.engine.connect() as conn:
+                return float((await conn.execute(LAG_QUERY)).scalar_one())
+        except Exception:
+            logger.warning("Replica lag check failed, reading from primary", exc_info=True)
+            return None
+
+    async def usable(self) -> bool:
+        if time.monotonic() - self.checked_at >= config.REPLICA_LAG_CHECK_SECONDS:
+            async with self._lock:
+                if time.monotonic() - self.checked_at >= config.REPLICA_LAG_CHECK_SECONDS:
+                    self.lag = await self._measure()
+                    self.checked_at = time.monotonic()
+        return self.lag is not None and self.lag <= config.REPLICA_MAX_LAG_SECONDS
+
+
+def register_replica_gauge(check: ReplicaLagCheck) -> None:
+    Gauge("db_replica_lag_seconds", "Last measured replica lag, -1 if unreachable", lambda: -1 if check.lag is None else check.lag)
@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, AsyncIterator
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import(
     create_async_engine,
@@ -9,15 +9,89 @@ from sqlalchemy.ext.asyncio import(
 
 from core.config import Settings
 from .unit_of_work import UoW
+from .profiling import install_query_profiler
+from .pool import MeteredPool, register_pool_gauges
+from .replica import ReplicaLagCheck, register_replica_gauge
 
 config = Settings() # pyright: ignore[reportCallIssue]
 
-engine: AsyncEngine = create_async_engine(config.DATABASE_URL, echo=True)
+def _make_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=config.DB_ECHO,
+        poolclass=MeteredPool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        connect_args={
+            # asyncpg's own statement cache and SQLAlchemy's prepared statement cache,
+            # both must be 0 behind pgbouncer in transaction mode
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+    if config.QUERY_PROFILING:
+        install_query_profiler(engine)
+    return engine
+
+
+engine: AsyncEngine = _make_engine(config.DATABASE_URL)
+register_pool_gauges(engine.pool)  # pyright: ignore[reportArgumentType]
 async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(engine, expire_on_commit=False)
 
+# Optional streaming replica for read-only endpoints
+replica_engine: AsyncEngine | None = (
+    _make_engine(config.DATABASE_REPLICA_URL) if config.DATABASE_REPLICA_URL else None
+)
+# Read sessions run in autocommit, which saves the BEGIN and COMMIT round trips
+read_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"), expire_on_commit=False
+)
+replica_session: async_sessionmaker[AsyncSession] | None = (
+    async_sessionmaker(
+        replica_engine.execution_options(isolation_level="AUTOCOMMIT"), expire_on_commit=False
+    )
+    if replica_engine
+    else None
+)
+replica_lag = ReplicaLagCheck(replica_engine) if replica_engine else None
+if replica_lag is not None:
+    register_replica_gauge(replica_lag)
+
 
 async def get_uow() -> AsyncGenerator[UoW, None]:
-    """Yields Unit of Work instead of raw sessions."""
+    """
+    Yields request-scoped Unit of Work instead of raw sessions: services
+    stage changes and everything is committed once on exit.
+    Depend on it with scope="function" everywhere, so the commit happens
+    before the response is sent and all dependencies share one session.
+    """
+    async with async_session() as session:
+        async with UoW(session, deferred=True) as uow:
+            yield uow
+
+
+@asynccontextmanager
+async def new_uow() -> AsyncIterator[UoW]:
+    """Standalone Unit of Work for jobs and scripts, commit() commits right away"""
     async with async_session() as session:
         async with UoW(session) as uow:
             yield uow
+
+
+async def get_read_uow() -> AsyncGenerator[UoW, None]:
+    """
+    Unit of Work for read-only endpoints: uses the replica while its lag is
+    below REPLICA_MAX_LAG_SECONDS, otherwise the primary. Data may be a few
+    seconds stale and statements are not wrapped in one transaction,
+    never use it for anything that writes.
+    """
+    if replica_session is not None and replica_lag is not None and await replica_lag.usable():
+        session_factory = replica_session
+    else:
+        session_factory = read_session
+    async with session_factory() as session:
+        async with UoW(session) as uow:
+            yield uow
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Uuid,
@@ -36,10 +37,13 @@ class Team(TimestampMixin, Base):
     score: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
     users: Mapped[list["User"]] = relationship(
-        "User", back_populates="team", lazy="selectin"
+        "User", back_populates="team", lazy="raise"
     )
 
 
+Index("ix_teams_score_id", Team.score.desc(), Team.id.desc())
+
+
 class Prize(TimestampMixin, Base):
     __tablename__ = "prizes"
 
@@ -49,11 +53,13 @@ class Prize(TimestampMixin, Base):
     amount: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     emoji: Mapped[str] = mapped_column(String(20), default="", nullable=False)
     color_hex: Mapped[str] = mapped_column(String(20), default="#FFFFFF", nullable=False)
+    # Relative odds of being drawn by a casino spin
+    weight: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
 
     items: Mapped[list["InventoryItem"]] = relationship(
         "InventoryItem",
         back_populates="prize",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
     )
 
@@ -70,30 +76,48 @@ class InventoryItem(TimestampMixin, Base):
     )
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="AVAILABLE")
 
-    prize: Mapped["Prize"] = relationship("Prize", back_populates="items", lazy="joined")
-    user: Mapped["User"] = relationship("User", back_populates="items", lazy="joined")
+    prize: Mapped["Prize"] = relationship("Prize", back_populates="items", lazy="raise")
+    user: Mapped["User"] = relationship("User", back_populates="items", lazy="raise")
 
 
-class TokenQR(TimestampMixin, Base):
-    __tablename__ = "token_qr"
+# Keyset pagination of a user's inventory filtered by status
+Index(
+    "ix_inventory_items_user_status_created",
+    InventoryItem.user_id,
+    InventoryItem.status,
+    InventoryItem.created_at,
+    InventoryItem.id,
+)
+
+
+class InventoryCount(Base):
+    """
+    Number of a user's items per prize and status, kept in step with
+    inventory_items by InventoryInterface so grouped views don't scan every item
+    """
+    __tablename__ = "inventory_counts"
 
-    id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid4)
-    token: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
-    expires_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        nullable=False,
-        default=lambda: datetime.now(UTC),
-    )
     user_id: Mapped[UUID] = mapped_column(
-        Uuid(as_uuid=True),
-        ForeignKey("users.id"),
-        nullable=False,
+        Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
     )
-    item_id: Mapped[UUID] = mapped_column(
-        Uuid(as_uuid=True),
-        ForeignKey("inventory_items.id"),
-        nullable=False,
+    prize_id: Mapped[UUID] = mapped_column(
+        Uuid(as_uuid=True), ForeignKey("prizes.id", ondelete="CASCADE"), primary_key=True
     )
+    status: Mapped[str] = mapped_column(String(20), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+class RedeemAudit(Base):
+    """Issued and redeemed prize tokens, copied from Redis in the background"""
+    __tablename__ = "redeem_audit"
+
+    id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid4)
+    event: Mapped[str] = mapped_column(String(20), nullable=False)  # issued | redeemed
+    token: Mapped[str] = mapped_column(String(100), nullable=False)
+    item_id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), nullable=False, index=True)
+    user_id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), nullable=False)
+    actor_id: Mapped[UUID | None] = mapped_column(Uuid(as_uuid=True), nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
 
 class GameSession(TimestampMixin, Base):
@@ -116,3 +140,13 @@ class LaunchCode(TimestampMixin, Base):
     session_id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("game_sessions.id"), nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class LeaderboardSnapshot(Base):
+    """Rank of every player/team at the time of the last periodic snapshot"""
+    __tablename__ = "leaderboard_snapshots"
+
+    board: Mapped[str] = mapped_column(String(20), primary_key=True)
+    taken_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    member_id: Mapped[UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
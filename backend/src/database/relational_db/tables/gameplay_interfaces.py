@@ -1,9 +1,30 @@
+from collections import Counter
 from uuid import UUID
-from typing import Sequence
-from sqlalchemy import select, update
+from datetime import datetime
+from typing import Iterable, Mapping, Sequence
+from sqlalchemy import (
+    DateTime, String, Integer, Uuid, Row, select, update, delete, insert, func, or_, and_,
+    literal, tuple_, any_, true, values, column,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from .gameplay import Prize, InventoryItem, TokenQR, GameSession, Team, LaunchCode, Game
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .gameplay import (
+    Prize,
+    InventoryItem,
+    InventoryCount,
+    RedeemAudit,
+    GameSession,
+    Team,
+    LaunchCode,
+    Game,
+    LeaderboardSnapshot,
+)
+from .users.users_table import User
+from ..unit_of_work import WRITES_KEY
 
 
 class PrizesInterface:
@@ -36,34 +57,169 @@ class InventoryInterface:
     async def add(self, item: InventoryItem) -> InventoryItem:
         self.session.add(item)
         await self.session.flush()
+        await self._bump_counts({(item.user_id, item.prize_id, item.status): 1})
         return item
 
-    async def set_status(self, item_id: UUID, status: str) -> int:
+    async def add_many(self, items: list[dict]) -> None:
+        """Inserts all rows with a single INSERT ... VALUES statement"""
+        if not items:
+            return
+        await self.session.execute(insert(InventoryItem).values(items))
+        await self._bump_counts(
+            Counter((item["user_id"], item["prize_id"], item["status"]) for item in items)
+        )
+
+    async def set_status(self, item: InventoryItem, status: str) -> int:
+        """Moves the item to `status` unless someone else changed it first"""
         stmt = (
             update(InventoryItem)
-            .where(InventoryItem.id == item_id)
+            .where(InventoryItem.id == item.id, InventoryItem.status == item.status)
             .values(status=status)
+            .execution_options(synchronize_session=False)
         )
         res = await self.session.execute(stmt)
-        await self.session.flush()
-        return res.rowcount or 0
+        if not res.rowcount:
+            return 0
+        if status == item.status:
+            return res.rowcount
+        await self._bump_counts({
+            (item.user_id, item.prize_id, item.status): -1,
+            (item.user_id, item.prize_id, status): 1,
+        })
+        set_committed_value(item, "status", status)
+        return res.rowcount
+
+    async def redeem(self, item_ids: Sequence[UUID]) -> Sequence[Row]:
+        """
+        Marks AVAILABLE items as REDEEMED, moves their counters and returns
+        (item_id, user_id, prize_name, display_name) per redeemed item, all in one statement.
+        Items that are missing or already redeemed are simply absent from the result.
+        """
+        if not item_ids:
+            return []
+        available, redeemed = "AVAILABLE", "REDEEMED"
+
+        updated = (
+            update(InventoryItem)
+            .where(InventoryItem.id == any_(literal(list(item_ids), ARRAY(Uuid()))))
+            .where(InventoryItem.status == available)
+            .values(status=redeemed, updated_at=func.now())
+            .returning(InventoryItem.id, InventoryItem.user_id, InventoryItem.prize_id)
+            .cte("updated")
+        )
+        deltas = values(
+            column("status", String), column("delta", Integer), name="deltas"
+        ).data([(available, -1), (redeemed, 1)])
+        moved = (
+            select(updated.c.user_id, updated.c.prize_id, deltas.c.status, func.sum(deltas.c.delta))
+            .select_from(updated.join(deltas, true()))
+            .group_by(updated.c.user_id, updated.c.prize_id, deltas.c.status)
+            .order_by(updated.c.user_id, updated.c.prize_id, deltas.c.status)
+        )
+        counted = pg_insert(InventoryCount).from_select(
+            ["user_id", "prize_id", "status", "count"], moved
+        )
+        counted = counted.on_conflict_do_update(
+            index_elements=[InventoryCount.user_id, InventoryCount.prize_id, InventoryCount.status],
+            set_={"count": InventoryCount.count + counted.excluded.count},
+        ).cte("counted")
+
+        stmt = (
+            select(
+                updated.c.id.label("item_id"),
+                updated.c.user_id,
+                Prize.name.label("prize_name"),
+                User.display_name,
+            )
+            .add_cte(counted)
+            .select_from(updated)
+            .join(Prize, Prize.id == updated.c.prize_id)
+            .join(User, User.id == updated.c.user_id)
+            .execution_options(**{WRITES_KEY: True})
+        )
+        rows = await self.session.execute(stmt)
+        return rows.all()
+
+    async def existing(self, item_ids: Sequence[UUID]) -> set[UUID]:
+        if not item_ids:
+            return set()
+        rows = await self.session.scalars(
+            select(InventoryItem.id).where(InventoryItem.id == any_(literal(list(item_ids), ARRAY(Uuid()))))
+        )
+        return set(rows.all())
+
+    async def _bump_counts(self, deltas: Mapping[tuple[UUID, UUID, str], int]) -> None:
+        """Applies count deltas to inventory_counts in one upsert, same transaction as the items"""
+        if not deltas:
+            return
+        # Sorted so concurrent upserts for the same user lock rows in the same order
+        values = [
+            {"user_id": key[0], "prize_id": key[1], "status": key[2], "count": deltas[key]}
+            for key in sorted(deltas, key=lambda key: tuple(map(str, key)))
+        ]
+        stmt = pg_insert(InventoryCount).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InventoryCount.user_id, InventoryCount.prize_id, InventoryCount.status],
+            set_={"count": InventoryCount.count + stmt.excluded.count},
+        )
+        await self.session.execute(stmt)
+
+    async def page(
+        self,
+        user_id: UUID,
+        status: str,
+        *,
+        limit: int = 50,
+        cursor_created_at: datetime | None = None,
+        cursor_id: UUID | None = None,
+    ) -> list[InventoryItem]:
+        """Newest items first, served by ix_inventory_items_user_status_created"""
+        stmt = select(InventoryItem).where(
+            InventoryItem.user_id == user_id,
+            InventoryItem.status == status,
+        )
+        if cursor_created_at is not None and cursor_id is not None:
+            # Row comparison keeps the whole cursor condition inside the index range
+            stmt = stmt.where(
+                tuple_(InventoryItem.created_at, InventoryItem.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        stmt = stmt.order_by(InventoryItem.created_at.desc(), InventoryItem.id.desc()).limit(limit)
+        rows = await self.session.scalars(stmt)
+        return list(rows.all())
+
+    async def count_by_status(self, user_id: UUID) -> dict[str, int]:
+        stmt = (
+            select(InventoryCount.status, func.sum(InventoryCount.count))
+            .where(InventoryCount.user_id == user_id)
+            .group_by(InventoryCount.status)
+        )
+        rows = await self.session.execute(stmt)
+        return {status: int(count) for status, count in rows.all()}
+
+    async def grouped(self, user_id: UUID, status: str | None = None) -> Sequence[InventoryCount]:
+        """One row per (prize, status) the user holds at least one item of"""
+        stmt = select(InventoryCount).where(
+            InventoryCount.user_id == user_id,
+            InventoryCount.count > 0,
+        )
+        if status is not None:
+            stmt = stmt.where(InventoryCount.status == status)
+        stmt = stmt.order_by(InventoryCount.status, InventoryCount.prize_id)
+        rows = await self.session.scalars(stmt)
+        return rows.all()
 
 
-class TokenQRInterface:
+class RedeemAuditInterface:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_by_token(self, token: str) -> TokenQR | None:
-        return await self.session.scalar(select(TokenQR).where(TokenQR.token == token))
-
-    async def add(self, token_qr: TokenQR) -> TokenQR:
-        self.session.add(token_qr)
-        await self.session.flush()
-        return token_qr
-
-    async def delete(self, token_qr: TokenQR) -> None:
-        await self.session.delete(token_qr)
-        await self.session.flush()
+    async def add_many(self, events: list[dict]) -> None:
+        """Events already written by an earlier attempt (same id) are skipped"""
+        if not events:
+            return
+        await self.session.execute(
+            pg_insert(RedeemAudit).values(events).on_conflict_do_nothing(index_elements=[RedeemAudit.id])
+        )
 
 
 class GameSessionInterface:
@@ -114,3 +270,117 @@ class GamesInterface:
 
     async def get_by_slug(self, slug: str) -> Game | None:
         return await self.session.scalar(select(Game).where(Game.slug == slug))
+
+
+class LeaderboardInterface:
+    """Ranking queries over users (players) and teams (departments)"""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _name(model: type[User] | type[Team]):
+        if model is User:
+            return func.coalesce(User.display_name, User.username, "Player")
+        return Team.name
+
+    async def scores(self, model: type[User] | type[Team]) -> Sequence[Row]:
+        """Returns (id, name, score) of every row, used to rebuild cached boards"""
+        rows = await self.session.execute(
+            select(model.id, self._name(model).label("name"), model.score)
+        )
+        return rows.all()
+
+    async def page(
+        self,
+        model: type[User] | type[Team],
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> Sequence[Row]:
+        """Returns (id, name, score, rank) ordered by score desc"""
+        stmt = (
+            select(
+                model.id,
+                self._name(model).label("name"),
+                model.score,
+                func.rank().over(order_by=model.score.desc()).label("rank"),
+            )
+            .order_by(model.score.desc(), model.id.desc())
+            .offset(offset)
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        rows = await self.session.execute(stmt)
+        return rows.all()
+
+    async def rank_of(self, model: type[User] | type[Team], member_id: UUID) -> Row | None:
+        """Returns (position, rank, score) of a single row"""
+        me = aliased(model)
+        other = aliased(model)
+
+        higher = (
+            select(func.count(other.id))
+            .where(other.score > me.score)
+            .scalar_subquery()
+        )
+        position = (
+            select(func.count(other.id))
+            .where(
+                or_(
+                    other.score > me.score,
+                    and_(other.score == me.score, other.id > me.id),
+                )
+            )
+            .scalar_subquery()
+        )
+        row = await self.session.execute(
+            select(position.label("position"), (higher + 1).label("rank"), me.score)
+            .where(me.id == member_id)
+        )
+        return row.first()
+
+    async def take_snapshot(
+        self,
+        model: type[User] | type[Team],
+        board: str,
+        taken_at: datetime,
+    ) -> None:
+        """Stores current ranks in one INSERT ... SELECT and drops older snapshots"""
+        ranked = select(
+            literal(board, String),
+            literal(taken_at, DateTime(timezone=True)),
+            model.id,
+            func.rank().over(order_by=model.score.desc()),
+        )
+        await self.session.execute(
+            insert(LeaderboardSnapshot).from_select(
+                ["board", "taken_at", "member_id", "rank"], ranked
+            )
+        )
+        await self.session.execute(
+            delete(LeaderboardSnapshot).where(
+                LeaderboardSnapshot.board == board,
+                LeaderboardSnapshot.taken_at < taken_at,
+            )
+        )
+
+    async def snapshot_ranks(self, board: str, member_ids: Iterable[UUID]) -> dict[UUID, int]:
+        """Returns ranks from the latest snapshot for the given members"""
+        member_ids = list(member_ids)
+        if not member_ids:
+            return {}
+
+        latest = (
+            select(func.max(LeaderboardSnapshot.taken_at))
+            .where(LeaderboardSnapshot.board == board)
+            .scalar_subquery()
+        )
+        rows = await self.session.execute(
+            select(LeaderboardSnapshot.member_id, LeaderboardSnapshot.rank)
+            .where(
+                LeaderboardSnapshot.board == board,
+                LeaderboardSnapshot.taken_at == latest,
+                LeaderboardSnapshot.member_id.in_(member_ids),
+            )
+        )
+        return {row.member_id: row.rank for row in rows}
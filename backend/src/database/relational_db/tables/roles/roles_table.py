@@ -31,7 +31,7 @@ class Role(TimestampMixin, Base):
         "User",
         secondary="user_roles",
         back_populates="roles",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
@@ -1,8 +1,8 @@
 from uuid import UUID, uuid4
-from datetime import datetime
+from datetime import datetime, UTC
 from typing import TYPE_CHECKING
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import Uuid, String, Boolean, DateTime, Text, Index, Integer, ForeignKey
+from sqlalchemy import Uuid, String, Boolean, DateTime, Text, Index, Integer, ForeignKey, func
 
 from ..table_base import Base
 
@@ -32,7 +32,14 @@ class User(TimestampMixin, Base):
     score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     level: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     amount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Energy as of energy_updated_at, the current value is derived from elapsed time on read
     energy: Mapped[int] = mapped_column(Integer, nullable=False, default=10)
+    energy_updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(UTC),
+        server_default=func.now(),
+    )
     role: Mapped[str] = mapped_column(String(20), nullable=False, default="player")
     
     # Service
@@ -57,22 +64,23 @@ class User(TimestampMixin, Base):
         ),
     )
     
+    # Relationships are never loaded implicitly, queries must ask for them with loader options
     roles: Mapped[list["Role"]] = relationship(  # pyright: ignore
         "Role",
         secondary="user_roles",
         back_populates="users",
-        lazy="selectin",
+        lazy="raise",
     )
     team: Mapped["Team | None"] = relationship(
         "Team",
         back_populates="users",
-        lazy="selectin",
+        lazy="raise",
         uselist=False,
     )
     items: Mapped[list["InventoryItem"]] = relationship(
         "InventoryItem",
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
     )
     
@@ -88,3 +96,7 @@ class User(TimestampMixin, Base):
 
     def bump_auth_version(self) -> None:
         self.auth_version = (self.auth_version or 0) + 1
+
+
+# Backs leaderboard ranking (ORDER BY score DESC) with an index scan
+Index("ix_users_score_id", User.score.desc(), User.id.desc())
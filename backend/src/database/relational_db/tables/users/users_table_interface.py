@@ -1,7 +1,7 @@
 from uuid import UUID
 from datetime import date, datetime, timedelta
 from pydantic import EmailStr
-from sqlalchemy import select, and_, or_, func, delete, insert
+from sqlalchemy import Row, DateTime, Integer, select, and_, or_, func, delete, insert, update, case, cast, literal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -20,12 +20,31 @@ class UserInterface:
     async def get_by_id(self, id: UUID | str) -> User | None:
         stmt = (
             select(User)
+            .options(selectinload(User.roles))
             .where(User.id == id)
         )
         user = await self.session.scalar(stmt)
         
         return user
     
+    async def get_principal(self, id: UUID | str) -> Row | None:
+        """Returns (id, banned, auth_version, team_id, role_slugs) in one statement"""
+        stmt = (
+            select(
+                User.id,
+                User.banned,
+                User.auth_version,
+                User.team_id,
+                func.array_remove(func.array_agg(Role.slug), None).label("role_slugs"),
+            )
+            .outerjoin(UserRole, UserRole.user_id == User.id)
+            .outerjoin(Role, Role.id == UserRole.role_id)
+            .where(User.id == id)
+            .group_by(User.id)
+        )
+        row = await self.session.execute(stmt)
+        return row.first()
+
     async def get_by_email(self, email: EmailStr) -> User | None:
         user = await self.session.scalar(
             select(User).where(User.email == email)
@@ -33,6 +52,55 @@ class UserInterface:
         
         return user
 
+    async def add_amount(self, user_id: UUID, delta: int, required: int = 0) -> int | None:
+        """
+        Atomically changes the balance if it is at least `required`.
+        Returns the new balance or None when funds are insufficient.
+        """
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.amount >= required)
+            .values(amount=User.amount + delta)
+            .returning(User.amount)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.session.scalar(stmt)
+
+    async def spend_energy(
+        self,
+        user_id: UUID,
+        cost: int,
+        now: datetime,
+        max_energy: int,
+        seconds_per_point: int,
+    ) -> int | None:
+        """
+        Atomically takes `cost` energy if the user has enough, counting points
+        regenerated since energy_updated_at. The refill is materialised only here:
+        the anchor moves forward by whole regenerated points, or to `now` when
+        energy was full, so partial progress towards the next point is kept.
+        Returns energy left or None when there is not enough.
+        """
+        elapsed = func.extract("epoch", literal(now, DateTime(timezone=True)) - User.energy_updated_at)
+        gained = func.greatest(cast(func.floor(elapsed / seconds_per_point), Integer), 0)
+        current = func.least(max_energy, User.energy + gained)
+
+        stmt = (
+            update(User)
+            .where(User.id == user_id, current >= cost)
+            .values(
+                energy=current - cost,
+                energy_updated_at=case(
+                    (User.energy + gained >= max_energy, now),
+                    else_=User.energy_updated_at
+                    + func.make_interval(0, 0, 0, 0, 0, 0, gained * seconds_per_point),
+                ),
+            )
+            .returning(User.energy)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.session.scalar(stmt)
+
     async def admin_list_users(
         self,
         *,
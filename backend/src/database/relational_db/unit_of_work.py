@@ -1,28 +1,86 @@
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+WRITES_KEY = "uow_has_writes"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement(state: ORMExecuteState) -> None:
+    # Anything that isn't a SELECT (DML, raw text, DDL) counts as a write.
+    # A SELECT with DML in its CTEs declares it with execution_options(uow_has_writes=True)
+    if not state.is_select or state.execution_options.get(WRITES_KEY):
+        state.session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, _) -> None:
+    session.info[WRITES_KEY] = True
 
 
 class UoW:
-    """Unit-of-Work: single transaction, single session."""
-    def __init__(self, session: AsyncSession):
+    """
+    Unit-of-Work: single transaction, single session.
+    The session only checks out a connection on its first statement, and
+    COMMIT is skipped when nothing was written.
+
+    In deferred mode (request-scoped) `commit()` only flushes and the single
+    COMMIT happens on exit. Side effects that must only happen once data is
+    committed (caches, Redis) go through `on_commit()`.
+    """
+    def __init__(self, session: AsyncSession, deferred: bool = False):
         self.session = session
-        self._committed = False
+        self.deferred = deferred
+        self._on_commit: list[Callable[[], Awaitable[Any]]] = []
+
+    @property
+    def has_writes(self) -> bool:
+        return bool(self.session.info.get(WRITES_KEY)) or bool(
+            self.session.new or self.session.dirty or self.session.deleted
+        )
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, *_):
-        if exc_type is None and not self._committed:
-            await self.session.commit()
-        elif exc_type is not None:
+        if exc_type is not None:
+            self._on_commit.clear()
+            if self.session.in_transaction():
+                await self.session.rollback()
+            return
+
+        if self.has_writes:
+            await self._commit()
+        elif self.session.in_transaction():
+            # Read-only: rolling back just returns the connection
             await self.session.rollback()
+        await self._run_on_commit()
 
-    async def commit(self):
-        """Manually commit the current transaction and start a new one."""
+    async def _commit(self):
         await self.session.commit()
-        self._committed = True
-        # Start a new transaction for any subsequent operations
-        await self.session.begin()
-        self._committed = False
+        self.session.info.pop(WRITES_KEY, None)
+
+    async def _run_on_commit(self):
+        callbacks, self._on_commit = self._on_commit, []
+        for callback in callbacks:
+            await callback()
+
+    async def commit(self):
+        """
+        Commits the current transaction, the session begins a new one on next use.
+        Deferred units only flush, the COMMIT happens on exit.
+        """
+        if self.deferred:
+            await self.session.flush()
+            return
+        await self._commit()
+        await self._run_on_commit()
+
+    def on_commit(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        """Runs `callback` after the next successful commit, dropped on rollback"""
+        self._on_commit.append(callback)
 
     async def savepoint(self):
         """Create a savepoint for partial rollbacks."""
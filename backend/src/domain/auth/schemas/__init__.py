@@ -1,2 +1,3 @@
 from .basic_auth import UserRegister, UserLogin
 from .tokens import TokenPair, TokenSet
+from .principal import Principal
@@ -0,0 +1,14 @@
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class Principal(BaseModel):
+    """
+    Minimal identity of an authenticated user, cheap to cache.
+    Use it instead of the User row whenever a request only needs ids and roles.
+    """
+    id: UUID = Field(...)
+    banned: bool = Field(False)
+    auth_version: int = Field(...)
+    role_slugs: list[str] = Field(default_factory=list)
+    team_id: UUID | None = Field(None)
@@ -1,21 +1,30 @@
-from .enums import PrizeType, ItemStatus, LeaderboardType, Trend
+from .enums import PrizeType, ItemStatus, LeaderboardType, Trend, RedeemOutcome
 from .schemas import (
     Balance,
     Prize,
     InventoryItem,
+    InventoryPage,
+    InventoryGroup,
+    InventorySummary,
     ProfileResponse,
     ProfilePatch,
     RedeemTokenResponse,
     MainResponse,
     BetRequest,
     SpinResponse,
+    BatchSpinRequest,
+    BatchSpinResponse,
     LeaderboardEntry,
+    LeaderboardPage,
     GameStartResponse,
     GameScoreRequest,
     GameScoreResponse,
     GameInfo,
     AdminRedeemRequest,
     AdminRedeemResponse,
+    AdminBatchRedeemRequest,
+    AdminBatchRedeemResponse,
+    AdminRedeemResult,
     EnergyState,
     UserSummary,
 )
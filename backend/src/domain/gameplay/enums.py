@@ -12,6 +12,13 @@ class ItemStatus(str, Enum):
     REDEEMED = "REDEEMED"
 
 
+class RedeemOutcome(str, Enum):
+    REDEEMED = "REDEEMED"
+    TOKEN_NOT_FOUND = "TOKEN_NOT_FOUND"
+    ITEM_NOT_FOUND = "ITEM_NOT_FOUND"
+    ALREADY_REDEEMED = "ALREADY_REDEEMED"
+
+
 class LeaderboardType(str, Enum):
     PLAYERS = "PLAYERS"
     DEPARTMENTS = "DEPARTMENTS"
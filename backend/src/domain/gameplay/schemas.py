@@ -2,7 +2,8 @@ from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 
-from .enums import PrizeType, ItemStatus, LeaderboardType, Trend
+from domain.common import CursorPage
+from .enums import PrizeType, ItemStatus, LeaderboardType, Trend, RedeemOutcome
 
 
 class Balance(BaseModel):
@@ -34,6 +35,26 @@ class InventoryItem(BaseModel):
     color_hex: str
 
 
+class InventoryPage(CursorPage[InventoryItem]):
+    pass
+
+
+class InventoryGroup(BaseModel):
+    prize_id: UUID
+    name: str
+    type: PrizeType
+    status: ItemStatus
+    amount: int
+    emoji: str
+    color_hex: str
+    count: int
+
+
+class InventorySummary(BaseModel):
+    available: int = 0
+    redeemed: int = 0
+
+
 class ProfileResponse(BaseModel):
     id: UUID
     username: str | None
@@ -43,7 +64,15 @@ class ProfileResponse(BaseModel):
     level: int
     xp: int
     max_xp: int
-    inventory: list[InventoryItem] = Field(default_factory=list)
+    inventory: list[InventoryItem] = Field(
+        default_factory=list,
+        description="Newest available items only, the full list is paged by /profile/inventory",
+    )
+    inventory_next_cursor: str | None = Field(
+        None,
+        description="Set when `inventory` was cut short, pass it to /profile/inventory for the rest",
+    )
+    inventory_summary: InventorySummary = Field(default_factory=InventorySummary)
 
 
 class ProfilePatch(BaseModel):
@@ -80,6 +109,16 @@ class SpinResponse(BaseModel):
     new_balance: Balance
 
 
+class BatchSpinRequest(BaseModel):
+    bet: int = Field(..., gt=0, description="Bet per spin")
+    count: int = Field(..., ge=1, le=50, description="Number of spins")
+
+
+class BatchSpinResponse(BaseModel):
+    winners: list[Prize] = Field(..., description="Prize of every spin, in order")
+    new_balance: Balance
+
+
 class LeaderboardEntry(BaseModel):
     rank: int
     name: str
@@ -87,6 +126,10 @@ class LeaderboardEntry(BaseModel):
     trend: Trend = Trend.SAME
 
 
+class LeaderboardPage(CursorPage[LeaderboardEntry]):
+    me: LeaderboardEntry | None = Field(None, description="Caller's own entry in around-me mode")
+
+
 class GameStartResponse(BaseModel):
     session_id: UUID
     energy_left: int
@@ -124,3 +167,19 @@ class AdminRedeemResponse(BaseModel):
     item_name: str
     user_display_name: str | None
     redeemed_at: datetime
+
+
+class AdminBatchRedeemRequest(BaseModel):
+    redeem_tokens: list[str] = Field(..., min_length=1, max_length=100, description="Scanned tokens")
+
+
+class AdminRedeemResult(BaseModel):
+    redeem_token: str
+    outcome: RedeemOutcome
+    item_name: str | None = None
+    user_display_name: str | None = None
+
+
+class AdminBatchRedeemResponse(BaseModel):
+    results: list[AdminRedeemResult] = Field(..., description="Outcome of every token, in request order")
+    redeemed_at: datetime
@@ -1,3 +1,6 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi_limiter import FastAPILimiter
@@ -8,27 +11,50 @@ from pathlib import Path
 from api import get_api_routers
 from webhooks import get_webhooks
 from core.config import Settings, configure_logging, BASE_DIR
+from core.crypto import start_hashing, stop_hashing
+from core.middlewares.query_profiler import QueryProfilerMiddleware
 from database.redis import get_redis
-# from scheduler import init_scheduler
+from service.gameplay import rebuild_leaderboards, warm_catalogs
+from service.gameplay.catalogs import listen_for_invalidations
+from scheduler import init_scheduler
 
 
 config = Settings() # pyright: ignore[reportCallIssue]
 configure_logging()
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis = get_redis()
+    scheduler = init_scheduler()
     try:
         await FastAPILimiter.init(redis)
+        await start_hashing()
+        try:
+            await rebuild_leaderboards(redis)
+        except Exception:
+            # Boards are rebuilt lazily on first read, startup must not depend on it
+            logger.exception("Failed to warm up leaderboards")
+        try:
+            await warm_catalogs(redis)
+        except Exception:
+            # Catalogs load lazily on first use as well
+            logger.exception("Failed to warm up catalogs")
+        scheduler.start()
+        catalog_listener = asyncio.create_task(listen_for_invalidations(redis))
         yield
+        catalog_listener.cancel()
     finally:
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+        await stop_hashing()
         await redis.aclose()
 
 
 app = FastAPI(
     lifespan=lifespan,
     title='Winter Hack',
-    debug=True
+    debug=config.DEBUG
 )
 
 # Mount static
@@ -66,3 +92,10 @@ app.add_middleware(
     allow_headers=['X-CSRF-Token', 'X-Requested-With', 'Accept', 'Content-Type', 'Authorization', 'X-Client'],
     allow_credentials=True,
 )
+
+if config.QUERY_PROFILING:
+    app.add_middleware(
+        QueryProfilerMiddleware,
+        debug=config.DEBUG,
+        slow_query_ms=config.SLOW_QUERY_MS,
+    )
@@ -0,0 +1,34 @@
+"""add leaderboard score indexes
+
+Revision ID: 7c41e2a9d0b5
+Revises: 46037a067a79
+Create Date: 2026-10-18 11:02:13.184532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e2a9d0b5'
+down_revision: Union[str, Sequence[str], None] = '46037a067a79'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_users_score_id', 'users', [sa.text('score DESC'), sa.text('id DESC')], unique=False
+    )
+    op.create_index(
+        'ix_teams_score_id', 'teams', [sa.text('score DESC'), sa.text('id DESC')], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_teams_score_id', table_name='teams')
+    op.drop_index('ix_users_score_id', table_name='users')
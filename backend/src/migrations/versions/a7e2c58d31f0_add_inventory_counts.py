@@ -0,0 +1,45 @@
+"""add inventory counts
+
+Revision ID: a7e2c58d31f0
+Revises: f3b7a1c9d402
+Create Date: 2026-10-18 19:41:08.317624
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e2c58d31f0'
+down_revision: Union[str, Sequence[str], None] = 'f3b7a1c9d402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'inventory_counts',
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('prize_id', sa.Uuid(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['prize_id'], ['prizes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'prize_id', 'status'),
+    )
+    op.execute(
+        """
+        INSERT INTO inventory_counts (user_id, prize_id, status, count)
+        SELECT user_id, prize_id, status, count(*)
+        FROM inventory_items
+        GROUP BY user_id, prize_id, status
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('inventory_counts')
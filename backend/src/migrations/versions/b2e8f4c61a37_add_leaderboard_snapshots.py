@@ -0,0 +1,35 @@
+"""add leaderboard snapshots
+
+Revision ID: b2e8f4c61a37
+Revises: 7c41e2a9d0b5
+Create Date: 2026-10-18 12:17:42.905116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e8f4c61a37'
+down_revision: Union[str, Sequence[str], None] = '7c41e2a9d0b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'leaderboard_snapshots',
+        sa.Column('board', sa.String(length=20), nullable=False),
+        sa.Column('taken_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('member_id', sa.Uuid(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('board', 'taken_at', 'member_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('leaderboard_snapshots')
@@ -0,0 +1,38 @@
+"""add energy updated at
+
+Revision ID: c4d91e07a2f6
+Revises: e5a03d7b9c12
+Create Date: 2026-10-18 18:12:44.903117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d91e07a2f6'
+down_revision: Union[str, Sequence[str], None] = 'e5a03d7b9c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column(
+            'energy_updated_at',
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text('now()'),
+        ),
+    )
+    # Energy used to regenerate from updated_at, keep what players currently see
+    op.execute("UPDATE users SET energy_updated_at = COALESCE(updated_at, created_at, now())")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'energy_updated_at')
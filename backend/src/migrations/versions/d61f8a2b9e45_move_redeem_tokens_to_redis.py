@@ -0,0 +1,56 @@
+"""move redeem tokens to redis
+
+Revision ID: d61f8a2b9e45
+Revises: a7e2c58d31f0
+Create Date: 2026-10-18 20:16:52.640183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd61f8a2b9e45'
+down_revision: Union[str, Sequence[str], None] = 'a7e2c58d31f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Live tokens expire within minutes, players just generate a new one
+    op.drop_table('token_qr')
+    op.create_table(
+        'redeem_audit',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('event', sa.String(length=20), nullable=False),
+        sa.Column('token', sa.String(length=100), nullable=False),
+        sa.Column('item_id', sa.Uuid(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('actor_id', sa.Uuid(), nullable=True),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_redeem_audit_item_id'), 'redeem_audit', ['item_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_redeem_audit_item_id'), table_name='redeem_audit')
+    op.drop_table('redeem_audit')
+    op.create_table(
+        'token_qr',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('token', sa.String(length=100), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('item_id', sa.Uuid(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token'),
+    )
@@ -0,0 +1,28 @@
+"""add prize weight
+
+Revision ID: e5a03d7b9c12
+Revises: b2e8f4c61a37
+Create Date: 2026-10-18 13:40:08.551276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a03d7b9c12'
+down_revision: Union[str, Sequence[str], None] = 'b2e8f4c61a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('prizes', sa.Column('weight', sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('prizes', 'weight')
@@ -0,0 +1,33 @@
+"""add inventory page index
+
+Revision ID: f3b7a1c9d402
+Revises: c4d91e07a2f6
+Create Date: 2026-10-18 19:04:31.552870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7a1c9d402'
+down_revision: Union[str, Sequence[str], None] = 'c4d91e07a2f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_inventory_items_user_status_created',
+        'inventory_items',
+        ['user_id', 'status', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_inventory_items_user_status_created', table_name='inventory_items')
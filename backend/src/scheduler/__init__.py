@@ -1,9 +1,36 @@
+import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from datetime import datetime, timedelta
 
+from core.config import Settings
+from database.redis import LeaderboardRepo, get_redis
+from database.relational_db import new_uow, LeaderboardInterface
+from service.gameplay import LeaderboardService, flush_redeem_audit
+
+config = Settings() # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+
+async def snapshot_leaderboards():
+    """
+    Stores rank snapshots used for leaderboard trends and
+    reloads cached boards from Postgres to fix any drift.
+    """
+    async with new_uow() as uow:
+        svc = LeaderboardService(uow, LeaderboardInterface(uow.session), LeaderboardRepo(get_redis()))
+        await svc.snapshot()
+        try:
+            await svc.rebuild()
+        except Exception:
+            logger.exception("Failed to rebuild cached leaderboards")
+
+
+async def write_redeem_audit():
+    """Moves queued redeem token events to Postgres, off the request path"""
+    redis = get_redis()
+    while await flush_redeem_audit(redis) == config.REDEEM_AUDIT_BATCH:
+        pass
 
-def example_scheduler():
-    pass
 
 def init_scheduler():
     """
@@ -12,16 +39,25 @@ def init_scheduler():
     scheduler = AsyncIOScheduler()
     
     scheduler.add_job(
-        func=example_scheduler,
-        trigger="cron",
-        minute="*/10",
-        id="example",
-        next_run_time=datetime.now() + timedelta(seconds=3),
+        func=snapshot_leaderboards,
+        trigger="interval",
+        minutes=config.LEADERBOARD_SNAPSHOT_MINUTES,
+        id="leaderboard_snapshots",
+        next_run_time=datetime.now() + timedelta(seconds=30),
         max_instances=1,
         coalesce=True,
         misfire_grace_time=60,
     )
     
+    scheduler.add_job(
+        func=write_redeem_audit,
+        trigger="interval",
+        seconds=config.REDEEM_AUDIT_FLUSH_SECONDS,
+        id="redeem_audit",
+        max_instances=1,
+        coalesce=True,
+    )
+
     # scheduler.start()
 
     return scheduler
@@ -0,0 +1,56 @@
+"""
+Compares password hashing throughput on the thread and process pools.
+
+Runs `requests` concurrent hash_password / verify_password calls against each
+pool kind with the same number of workers. needs_rehash only parses the hash
+and runs inline, its row shows what a pool round trip would add to it.
+
+Usage (from src): python -m scripts.bench_hashing [requests] [workers]
+"""
+import asyncio
+import os
+import sys
+import time
+
+from core import crypto
+
+
+async def rate(make_call, requests: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(make_call() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def bench(kind: str, requests: int, workers: int, hashed: str) -> dict[str, float]:
+    await crypto.start_hashing(kind, workers)  # pyright: ignore[reportArgumentType]
+    try:
+        return {
+            "hash_password": await rate(lambda: crypto.hash_password("correct horse"), requests),
+            "verify_password": await rate(lambda: crypto.verify_password("correct horse", hashed), requests),
+            "needs_rehash (pool)": await rate(
+                lambda: crypto._run_hashing(crypto._needs_update, hashed), requests * 50
+            ),
+        }
+    finally:
+        await crypto.stop_hashing()
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    # Let the benchmark queue everything instead of getting 503s
+    crypto.config.HASH_QUEUE_LIMIT = requests * 50
+
+    hashed = crypto._hash("correct horse")
+    results = {kind: await bench(kind, requests, workers, hashed) for kind in ("thread", "process")}
+    inline = await rate(lambda: crypto.needs_rehash(hashed), requests * 50)
+
+    print(f"{requests} concurrent calls, {workers} workers, {os.cpu_count()} cpus")
+    print(f"{'op/s':<22} {'thread':>10} {'process':>10}")
+    for op in results["thread"]:
+        print(f"{op:<22} {results['thread'][op]:>10.1f} {results['process'][op]:>10.1f}")
+    print(f"{'needs_rehash (inline)':<22} {inline:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
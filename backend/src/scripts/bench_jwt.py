@@ -0,0 +1,57 @@
+"""
+Compares JWT sign/verify throughput for the supported algorithms.
+
+Uses freshly generated keys and a payload shaped like our access tokens,
+keys are pre-parsed the same way TokenService does it.
+
+Usage (from src): python -m scripts.bench_jwt [iterations]
+"""
+import sys
+import time
+from uuid import uuid4
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+
+def make_keys():
+    return {
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+
+def rate(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    now = int(time.time())
+    payload = {
+        "sub": str(uuid4()),
+        "jti": uuid4().hex,
+        "typ": "access",
+        "src": "web",
+        "av": 1,
+        "iat": now,
+        "exp": now + 900,
+    }
+
+    print(f"{'algo':<6} {'sign/s':>10} {'verify/s':>10} {'token bytes':>12}")
+    for algo, private_key in make_keys().items():
+        public_key = private_key.public_key()
+        headers = {"kid": "bench"}
+        token = jwt.encode(payload, private_key, algorithm=algo, headers=headers)
+
+        sign = rate(lambda: jwt.encode(payload, private_key, algorithm=algo, headers=headers), iterations)
+        verify = rate(lambda: jwt.decode(token, public_key, algorithms=[algo]), iterations)
+        print(f"{algo:<6} {sign:>10.0f} {verify:>10.0f} {len(token):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Fires many parallel casino spins for a single user and checks the balance.
+
+Creates a throwaway user, runs the spins through CasinoService with one
+session per spin (as separate requests would) and verifies that neither
+any spin nor the final balance ever went negative.
+
+Concurrency is capped so the run does not just time out waiting for pool
+connections, keep it at or above the pool size to get real races.
+
+Usage (from src): python -m scripts.bench_spin_concurrency [spins] [balance] [bet] [concurrency]
+"""
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+
+from database.redis import RedeemTokenRepo, get_redis
+from database.relational_db import (
+    UoW,
+    User,
+    InventoryItem,
+    PrizesInterface,
+    InventoryInterface,
+    UserInterface,
+)
+from database.relational_db.session import async_session
+from domain.gameplay import BetRequest
+from service.gameplay import CasinoService
+from service.gameplay.catalogs import prize_catalog
+
+
+async def spin_once(user_id, bet: int, limit: asyncio.Semaphore) -> tuple[int, int | None]:
+    """Returns (http status, new balance)"""
+    async with limit, async_session() as session:
+        async with UoW(session) as uow:
+            svc = CasinoService(
+                uow,
+                PrizesInterface(session),
+                InventoryInterface(session),
+                RedeemTokenRepo(get_redis()),
+                UserInterface(session),
+                get_redis(),
+                prize_catalog,
+            )
+            try:
+                result = await svc.spin(BetRequest(bet=bet), SimpleNamespace(id=user_id))
+            except HTTPException as exc:
+                return exc.status_code, None
+            return 200, result.new_balance.amount
+
+
+async def main(spins: int, balance: int, bet: int, concurrency: int) -> int:
+    user_id = uuid4()
+    async with async_session() as session:
+        session.add(User(
+            id=user_id,
+            email=f"bench-{user_id.hex[:12]}@example.com",
+            password_hash="-",
+            amount=balance,
+        ))
+        await session.commit()
+
+    try:
+        limit = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(spin_once(user_id, bet, limit) for _ in range(spins)))
+        elapsed = time.perf_counter() - started
+
+        async with async_session() as session:
+            final = await session.scalar(select(User.amount).where(User.id == user_id))
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(InventoryItem).where(InventoryItem.user_id == user_id))
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+
+    ok = [amount for code, amount in results if code == 200]
+    rejected = sum(1 for code, _ in results if code == 402)
+    errors = len(results) - len(ok) - rejected
+    print(f"{spins} spins in {elapsed:.2f}s ({spins / elapsed:.0f}/s): "
+          f"{len(ok)} ok, {rejected} insufficient funds, {errors} errors")
+    print(f"balance: start={balance} final={final} lowest seen={min(ok, default=balance)}")
+
+    failed = final is None or final < 0 or any(amount < 0 for amount in ok) or errors > 0
+    print("FAIL" if failed else "ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:5]]
+    spins, balance, bet, concurrency = args + [2000, 500, 10, 15][len(args):]
+    sys.exit(asyncio.run(main(spins, balance, bet, concurrency)))
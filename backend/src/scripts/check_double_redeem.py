@@ -0,0 +1,126 @@
+"""
+Redeems the same prize concurrently from many "scanners" and checks it only
+succeeds once.
+
+Creates a throwaway user, prize and two items, then runs two races through
+AdminService with one session per scan (as separate requests would):
+  - one token scanned `scans` times at once (Redis GETDEL decides)
+  - `scans` tokens issued for the same item, all scanned at once
+    (the conditional UPDATE decides)
+Afterwards the inventory counters must show both items as redeemed.
+
+Usage (from src): python -m scripts.check_double_redeem [scans]
+"""
+import asyncio
+import sys
+from collections import Counter
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+
+from database.redis import RedeemTokenRepo, get_redis
+from database.relational_db import (
+    UoW,
+    User,
+    Prize,
+    InventoryItem,
+    InventoryCount,
+    PrizesInterface,
+    InventoryInterface,
+    UserInterface,
+)
+from database.relational_db.session import async_session
+from domain.gameplay import ItemStatus
+from service.gameplay import AdminService, CasinoService
+from service.gameplay.catalogs import prize_catalog
+
+
+async def issue(user_id: UUID, item_id: UUID) -> str:
+    async with async_session() as session, UoW(session) as uow:
+        svc = CasinoService(
+            uow,
+            PrizesInterface(session),
+            InventoryInterface(session),
+            RedeemTokenRepo(get_redis()),
+            UserInterface(session),
+            get_redis(),
+            prize_catalog,
+        )
+        response = await svc.generate_redeem_token(item_id, SimpleNamespace(id=user_id))
+        return response.redeem_token
+
+
+async def scan(token: str, start: asyncio.Event) -> int:
+    """Returns the http status the scanner would get"""
+    await start.wait()
+    async with async_session() as session:
+        try:
+            async with UoW(session) as uow:
+                await AdminService(uow, RedeemTokenRepo(get_redis()), InventoryInterface(session)).redeem(token)
+        except HTTPException as exc:
+            return exc.status_code
+        return 200
+
+
+async def race(tokens: list[str]) -> Counter:
+    start = asyncio.Event()
+    scans = [asyncio.create_task(scan(token, start)) for token in tokens]
+    await asyncio.sleep(0)
+    start.set()
+    return Counter(await asyncio.gather(*scans))
+
+
+async def main(scans: int) -> int:
+    user_id, prize_id = uuid4(), uuid4()
+    async with async_session() as session, UoW(session) as uow:
+        session.add(User(id=user_id, email=f"redeem-{user_id.hex[:12]}@example.com", password_hash="-"))
+        # Weight 0 so real spins never draw it
+        session.add(Prize(id=prize_id, name=f"redeem-{prize_id.hex[:12]}", type="ITEM", weight=0))
+        await session.flush()
+        items = [
+            InventoryItem(user_id=user_id, prize_id=prize_id, status=ItemStatus.AVAILABLE.value)
+            for _ in range(2)
+        ]
+        for item in items:
+            await InventoryInterface(session).add(item)
+        await uow.commit()
+
+    try:
+        token = await issue(user_id, items[0].id)
+        same_token = await race([token] * scans)
+        tokens = [await issue(user_id, items[1].id) for _ in range(scans)]
+        same_item = await race(tokens)
+
+        async with async_session() as session:
+            rows = await session.execute(
+                select(InventoryCount.status, InventoryCount.count).where(InventoryCount.user_id == user_id)
+            )
+            counts = dict(rows.all())
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(InventoryItem).where(InventoryItem.user_id == user_id))
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.execute(delete(Prize).where(Prize.id == prize_id))
+            await session.commit()
+
+    print(f"one token, {scans} scans: {dict(same_token)}")
+    print(f"{scans} tokens, one item: {dict(same_item)}")
+    print(f"counters: {counts}")
+
+    failed = (
+        same_token[200] != 1
+        or same_token[404] != scans - 1
+        or same_item[200] != 1
+        or same_item[410] != scans - 1
+        or counts.get(ItemStatus.AVAILABLE.value) != 0
+        or counts.get(ItemStatus.REDEEMED.value) != 2
+    )
+    print("FAIL" if failed else "ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    scans = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sys.exit(asyncio.run(main(scans)))
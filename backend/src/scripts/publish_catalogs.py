@@ -0,0 +1,32 @@
+"""
+Tells every running process to reload its catalogs.
+
+Games and prizes are only written by migrations, the seed and manual SQL,
+none of which run inside the app, so nothing else announces the change.
+entry.sh runs this after `alembic upgrade head`, run it by hand after
+editing those tables directly.
+
+Usage (from src): python -m scripts.publish_catalogs [name ...]
+"""
+import asyncio
+import sys
+
+from database.redis import get_redis
+from service.gameplay.catalogs import CATALOGS
+
+
+async def main(names: list[str]) -> int:
+    unknown = [name for name in names if name not in CATALOGS]
+    if unknown:
+        print(f"unknown catalogs: {', '.join(unknown)} (known: {', '.join(CATALOGS)})")
+        return 1
+
+    redis = get_redis()
+    for name in names or list(CATALOGS):
+        await CATALOGS[name].publish_change(redis)
+        print(f"published {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
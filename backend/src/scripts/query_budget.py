@@ -0,0 +1,115 @@
+"""
+Asserts how many SQL statements each endpoint issues and reports
+how many pooled connections it checked out.
+
+Runs requests through the ASGI app against the configured database and Redis,
+so seed them first (python -m scripts.seed). Exits with 1 when any endpoint
+exceeds its budget, which catches relationship loading regressions.
+
+Usage (from src): python -m scripts.query_budget
+"""
+import asyncio
+import json
+import sys
+from urllib.parse import urlsplit
+
+from database.relational_db.session import engine
+from database.relational_db.profiling import StatementCounter, QueryProfile, current_profile
+from main import app
+
+LOGIN = {"email": "player1@example.com", "password": "player123"}
+
+# (method, path, body, max statements)
+BUDGETS = [
+    ("GET", "/api/v1/games", None, 1),
+    ("GET", "/api/v1/teams/", None, 1),
+    ("GET", "/api/v1/leaderboard?type=PLAYERS", None, 2),
+    ("GET", "/api/v1/leaderboard?type=DEPARTMENTS", None, 2),
+    ("GET", "/api/v1/users/me/", None, 2),
+    ("GET", "/api/v1/profile/me", None, 6),
+    ("GET", "/api/v1/profile/inventory", None, 3),
+    ("GET", "/api/v1/profile/balance", None, 3),
+    ("GET", "/api/v1/main", None, 6),
+    ("POST", "/api/v1/casino/spin", {"bet": 1}, 5),
+]
+
+
+async def request(
+    method: str,
+    url: str,
+    body: dict | None = None,
+    token: str | None = None,
+) -> tuple[int, bytes]:
+    """Minimal in-process ASGI client"""
+    parts = urlsplit(url)
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"content-type", b"application/json"), (b"x-client", b"mobile")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    sent = False
+    status = 500
+    chunks: list[bytes] = []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def main() -> int:
+    failed = False
+    async with app.router.lifespan_context(app):
+        status, body = await request("POST", "/api/v1/auth/login", LOGIN)
+        if status != 200:
+            print(f"Login failed ({status}): {body.decode()}")
+            return 1
+        token = json.loads(body)["access_token"]
+
+        for method, path, payload, budget in BUDGETS:
+            profile = QueryProfile()
+            profile_token = current_profile.set(profile)
+            try:
+                with StatementCounter(engine) as counter:
+                    status, _ = await request(method, path, payload, token)
+            finally:
+                current_profile.reset(profile_token)
+
+            ok = status < 400 and counter.count <= budget
+            failed |= not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {method:4} {path:45} status={status} statements={counter.count}/{budget} checkouts={profile.checkouts}")
+            if not ok:
+                for statement in counter.statements:
+                    print("     ", " ".join(statement.split())[:160])
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -6,9 +6,10 @@ from sqlalchemy import text, select
 
 from core.crypto import hash_password
 from core.config import Settings
+from database.redis import get_redis
 from database.relational_db import (
     UoW,
-    get_uow,
+    new_uow,
     User,
     Team,
     Prize,
@@ -20,6 +21,7 @@ from database.relational_db import (
     TeamsInterface,
 )
 from domain.gameplay import PrizeType, ItemStatus
+from service.gameplay.catalogs import prize_catalog
 
 
 settings = Settings()  # type: ignore
@@ -33,11 +35,11 @@ TEAMS = [
 ]
 
 PRIZES = [
-    {"name": "100 Coins", "type": PrizeType.MONEY, "amount": 100, "emoji": "💰", "color_hex": "#FFD700"},
-    {"name": "500 Coins", "type": PrizeType.MONEY, "amount": 500, "emoji": "💰", "color_hex": "#FFD700"},
-    {"name": "Sticker Pack", "type": PrizeType.ITEM, "amount": 1, "emoji": "😎", "color_hex": "#FF0000"},
-    {"name": "T-Shirt", "type": PrizeType.ITEM, "amount": 1, "emoji": "👕", "color_hex": "#336699"},
-    {"name": "Mystery Trash", "type": PrizeType.TRASH, "amount": 1, "emoji": "🗑️", "color_hex": "#777777"},
+    {"name": "100 Coins", "type": PrizeType.MONEY, "amount": 100, "emoji": "💰", "color_hex": "#FFD700", "weight": 30},
+    {"name": "500 Coins", "type": PrizeType.MONEY, "amount": 500, "emoji": "💰", "color_hex": "#FFD700", "weight": 5},
+    {"name": "Sticker Pack", "type": PrizeType.ITEM, "amount": 1, "emoji": "😎", "color_hex": "#FF0000", "weight": 20},
+    {"name": "T-Shirt", "type": PrizeType.ITEM, "amount": 1, "emoji": "👕", "color_hex": "#336699", "weight": 5},
+    {"name": "Mystery Trash", "type": PrizeType.TRASH, "amount": 1, "emoji": "🗑️", "color_hex": "#777777", "weight": 40},
 ]
 
 USERS = [
@@ -85,7 +87,7 @@ USERS = [
 
 
 async def seed(reset: bool = True) -> None:
-    async for uow in get_uow():
+    async with new_uow() as uow:
         user_repo = UserInterface(uow.session)
         team_repo = TeamsInterface(uow.session)
         prize_repo = PrizesInterface(uow.session)
@@ -94,7 +96,7 @@ async def seed(reset: bool = True) -> None:
 
         if reset:
             # Truncate in FK-safe order
-            for table in ("token_qr", "inventory_items", "game_sessions", "users", "prizes", "teams"):
+            for table in ("inventory_counts", "inventory_items", "game_sessions", "users", "prizes", "teams"):
                 await uow.session.execute(text(f'TRUNCATE "{table}" CASCADE;'))
             await uow.session.commit()
 
@@ -158,10 +160,12 @@ async def seed(reset: bool = True) -> None:
                         user_id=uid,
                         status=ItemStatus.AVAILABLE.value,
                     )
-                    uow.session.add(item)
+                    await inventory_repo.add(item)
 
         await uow.commit()
 
+    await prize_catalog.publish_change(get_redis())
+
 
 if __name__ == "__main__":
     asyncio.run(seed(reset=True))
@@ -12,7 +12,7 @@ from ..tokens import TokenService, get_token_service
 
 
 async def get_credentials_service(
-    uow: Annotated[UoW, Depends(get_uow)],
+    uow: Annotated[UoW, Depends(get_uow, scope="function")],
     token_service: Annotated[TokenService, Depends(get_token_service)],
 ) -> CredentialsService:
     user_repo = UserInterface(uow.session)
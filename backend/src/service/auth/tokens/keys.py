@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from functools import cache
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+
+from core.config import Settings
+
+
+def algorithm_for(public_key) -> str:
+    """Picks the JWT algorithm matching the key type"""
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        if not isinstance(public_key.curve, ec.SECP256R1):
+            raise ValueError("Only P-256 EC keys are supported (ES256)")
+        return "ES256"
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    raise ValueError(f"Unsupported JWT key type: {type(public_key).__name__}")
+
+
+@dataclass(frozen=True)
+class VerifyKey:
+    kid: str
+    algorithm: str
+    key: object
+
+
+@dataclass(frozen=True)
+class KeyRing:
+    """
+    Parsed JWT keys. PEMs are loaded once at import instead of on every
+    encode/decode call, tokens are signed with the current key and carry its `kid`.
+    """
+    kid: str
+    algorithm: str
+    private_key: object
+    verify_keys: dict[str, VerifyKey]
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "KeyRing":
+        private_key = load_pem_private_key(settings.JWT_PRIVATE_KEY.encode(), password=None)
+        public_key = load_pem_public_key(settings.JWT_PUBLIC_KEY.encode())
+
+        algorithm = algorithm_for(public_key)
+        if settings.JWT_ALGO != algorithm:
+            raise ValueError(f"JWT_ALGO is {settings.JWT_ALGO} but the configured key is {algorithm}")
+
+        verify_keys = {
+            kid: VerifyKey(kid, algorithm_for(key), key)
+            for kid, key in (
+                (kid, load_pem_public_key(pem.encode()))
+                for kid, pem in settings.JWT_PREVIOUS_PUBLIC_KEYS.items()
+            )
+        }
+        verify_keys[settings.JWT_KID] = VerifyKey(settings.JWT_KID, algorithm, public_key)
+        return cls(settings.JWT_KID, algorithm, private_key, verify_keys)
+
+    def verify_key(self, kid: str | None) -> VerifyKey | None:
+        # Tokens issued before key ids were introduced have no `kid`
+        return self.verify_keys.get(kid or self.kid)
+
+
+@cache
+def get_keys() -> KeyRing:
+    """Loaded on first use so importing the app does not require valid keys"""
+    return KeyRing.from_settings(Settings())  # pyright: ignore[reportCallIssue]
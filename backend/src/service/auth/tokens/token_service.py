@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import hmac
 import logging
+import time
 from datetime import UTC, datetime, timedelta
 from typing import Literal
 from uuid import uuid4
@@ -9,17 +12,66 @@ from uuid import uuid4
 import jwt
 
 from core.config import Settings
-from database.redis import CacheRepo
+from database.redis import BlocklistRepo
 from database.relational_db import User, UserInterface
+from utils.bloom import BloomFilter
+from utils.ttl_cache import TTLCache
+from .keys import get_keys
 
 config = Settings()  # pyright: ignore[reportCallIssue]
 logger = logging.getLogger(__name__)
-PRIVATE_KEY = config.JWT_PRIVATE_KEY.encode()
-PUBLIC_KEY = config.JWT_PUBLIC_KEY.encode()
+
+# Decoded payloads of tokens whose signature was already checked, keyed by token hash
+_verified: TTLCache[dict[str, int | str]] = TTLCache(maxsize=config.TOKEN_CACHE_SIZE)
+
+
+class _BlockedJtis:
+    """
+    Per-process Bloom filter of blocked JTIs, synced from Redis every
+    BLOCKLIST_SYNC_SECONDS. A miss means the token is not blocked as of the
+    last sync; a hit is confirmed against Redis.
+
+    Access and refresh tokens share a JTI, and only access tokens are checked
+    through the filter, so it only needs blocks from the last ACCESS_TTL.
+    Syncs add new blocks; the filter is rebuilt once per ACCESS_TTL to drop old ones.
+    """
+    def __init__(self):
+        self.bloom = BloomFilter()
+        self.synced_at = float("-inf")
+        self.rebuilt_at = float("-inf")
+        self.last_blocked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def ensure(self, repo: BlocklistRepo) -> None:
+        if time.monotonic() - self.synced_at < config.BLOCKLIST_SYNC_SECONDS:
+            return
+        async with self._lock:
+            if time.monotonic() - self.synced_at < config.BLOCKLIST_SYNC_SECONDS:
+                return
+            rebuild = time.monotonic() - self.rebuilt_at >= config.ACCESS_TTL or self.bloom.full
+            # Overlap with the previous sync, workers' clocks are not exactly in step
+            if rebuild:
+                since = time.time() - config.ACCESS_TTL
+            else:
+                since = self.last_blocked_at - config.BLOCKLIST_SYNC_SECONDS
+            blocked = await repo.blocked_since(since)
+
+            if rebuild:
+                self.bloom = BloomFilter.from_items(jti for jti, _ in blocked)
+                self.rebuilt_at = time.monotonic()
+            else:
+                for jti, _ in blocked:
+                    self.bloom.add(jti)
+            if blocked:
+                self.last_blocked_at = max(self.last_blocked_at, blocked[-1][1])
+            self.synced_at = time.monotonic()
+
+
+_blocked = _BlockedJtis()
 
 
 class TokenService:
-    def __init__(self, repo: CacheRepo, user_repo: UserInterface):
+    def __init__(self, repo: BlocklistRepo, user_repo: UserInterface):
         self.repo = repo
         self.user_repo = user_repo
 
@@ -29,19 +81,56 @@ class TokenService:
             config.CSRF_HMAC_KEY, refresh_token.encode(), "sha256"
         ).hexdigest()
 
-    async def _verify_token(self, token: str) -> dict[str, int | str] | None:
+    @staticmethod
+    def _decode(token: str) -> dict[str, int | str] | None:
+        cache_key = hashlib.sha256(token.encode()).digest()
+        payload = _verified.get(cache_key)
+        if payload is not None:
+            if int(payload["exp"]) > time.time():
+                return payload
+            _verified.delete(cache_key)
+
         try:
-            payload = jwt.decode(token, PUBLIC_KEY, algorithms=[config.JWT_ALGO])
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = get_keys().verify_key(kid)
+            if key is None:
+                logger.info("Failed to decode jwt: unknown key id %s", kid)
+                return None
+            payload = jwt.decode(token, key.key, algorithms=[key.algorithm])
         except jwt.PyJWTError:
             logger.info("Failed to decode jwt")
             return None
 
-        jti = payload["jti"]
-        if await self.repo.exists(f"block:{jti}"):
+        _verified.set(cache_key, payload, int(payload["exp"]) - time.time())
+        return payload
+
+    async def _is_blocked(self, jti: str, strict: bool) -> bool:
+        if not strict:
+            await _blocked.ensure(self.repo)
+            if jti not in _blocked.bloom:
+                return False
+        return await self.repo.is_blocked(jti)
+
+    async def _block(self, jti: str, ttl: int) -> None:
+        await self.repo.block(jti, ttl, index_seconds=config.ACCESS_TTL)
+        _blocked.bloom.add(jti)
+
+    async def _verify_token(self, token: str, strict: bool = False) -> dict[str, int | str] | None:
+        """
+        Decodes and checks the token against the blocklist.
+        `strict` always asks Redis, otherwise blocks made by other workers
+        are seen after at most BLOCKLIST_SYNC_SECONDS.
+        """
+        payload = self._decode(token)
+        if payload is None:
+            return None
+
+        jti = str(payload["jti"])
+        if await self._is_blocked(jti, strict):
             logger.info("Failed to verify JWT: this token is blocked")
             return None
 
-        return payload
+        return dict(payload)
 
     async def issue_tokens(
         self,
@@ -51,6 +140,8 @@ class TokenService:
         user_id = str(user.id)
         now = datetime.now(UTC)
         version = int(user.auth_version)
+        keys = get_keys()
+        headers = {"kid": keys.kid}
 
         jti = uuid4().hex
         access_payload = {
@@ -62,7 +153,9 @@ class TokenService:
             "iat": int(now.timestamp()),
             "exp": int((now + timedelta(seconds=config.ACCESS_TTL)).timestamp()),
         }
-        access = jwt.encode(access_payload, PRIVATE_KEY, algorithm=config.JWT_ALGO)
+        access = jwt.encode(
+            access_payload, keys.private_key, algorithm=keys.algorithm, headers=headers
+        )
 
         refresh_payload = {
             "sub": user_id,
@@ -73,7 +166,9 @@ class TokenService:
             "iat": int(now.timestamp()),
             "exp": int((now + timedelta(seconds=config.REFRESH_TTL)).timestamp()),
         }
-        refresh = jwt.encode(refresh_payload, PRIVATE_KEY, algorithm=config.JWT_ALGO)
+        refresh = jwt.encode(
+            refresh_payload, keys.private_key, algorithm=keys.algorithm, headers=headers
+        )
 
         csrf = self._make_csrf(refresh)
 
@@ -84,7 +179,7 @@ class TokenService:
         refresh_token: str,
         csrf: str | None = None,
     ) -> tuple[str, str, str] | None:
-        payload = await self._verify_token(refresh_token)
+        payload = await self._verify_token(refresh_token, strict=True)
         if payload is None or payload["typ"] != "refresh":
             return None
 
@@ -98,9 +193,9 @@ class TokenService:
         elif src != "mobile":
             return None
 
-        jti = payload["jti"]
+        jti = str(payload["jti"])
         ttl = int(payload["exp"]) - int(datetime.now(UTC).timestamp())
-        await self.repo.set(f"block:{jti}", "1", ttl)
+        await self._block(jti, ttl)
 
         user_id = payload["sub"]
         user = await self.user_repo.get_by_id(user_id)
@@ -118,12 +213,12 @@ class TokenService:
         return await self.issue_tokens(user, src)
 
     async def revoke(self, refresh_token: str) -> dict[str, int | str] | None:
-        payload = await self._verify_token(refresh_token)
+        payload = await self._verify_token(refresh_token, strict=True)
         if payload is None or payload["typ"] != "refresh":
             return None
 
         ttl = int(payload["exp"]) - int(datetime.now(UTC).timestamp())
-        await self.repo.set(f"block:{payload['jti']}", "1", ttl)
+        await self._block(str(payload["jti"]), ttl)
 
         return payload
 
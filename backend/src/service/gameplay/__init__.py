@@ -1,52 +1,151 @@
+from datetime import datetime
 from typing import Annotated
+from uuid import UUID, uuid4
 from fastapi import Depends
+from redis.asyncio import Redis
 
+from core.config import Settings
+from database.redis import LeaderboardRepo, RedeemTokenRepo, get_redis
 from database.relational_db import (
     UoW,
     get_uow,
+    get_read_uow,
+    new_uow,
     PrizesInterface,
     InventoryInterface,
-    TokenQRInterface,
     TeamsInterface,
     LaunchCodeInterface,
     GameSessionInterface,
     GamesInterface,
+    LeaderboardInterface,
+    UserInterface,
+    RedeemAuditInterface,
 )
 from .casino_service import CasinoService
 from .profile_service import ProfileService
 from .leaderboard_service import LeaderboardService
 from .admin_service import AdminService
 from .launch_service import LaunchService
+from .catalogs import prize_catalog, game_catalog
 
+config = Settings()  # pyright: ignore[reportCallIssue]
 
-async def get_casino_service(uow: Annotated[UoW, Depends(get_uow)]) -> CasinoService:
+
+async def get_casino_service(
+    uow: Annotated[UoW, Depends(get_uow, scope="function")],
+    redis: Annotated[Redis, Depends(get_redis)],
+) -> CasinoService:
     prizes_repo = PrizesInterface(uow.session)
     inventory_repo = InventoryInterface(uow.session)
-    token_repo = TokenQRInterface(uow.session)
-    return CasinoService(uow, prizes_repo, inventory_repo, token_repo)
+    token_repo = RedeemTokenRepo(redis)
+    user_repo = UserInterface(uow.session)
+    return CasinoService(
+        uow, prizes_repo, inventory_repo, token_repo, user_repo, redis, prize_catalog
+    )
+
 
+async def get_leaderboard_service(
+    uow: Annotated[UoW, Depends(get_read_uow, scope="function")],
+    redis: Annotated[Redis, Depends(get_redis)],
+) -> LeaderboardService:
+    lb_repo = LeaderboardInterface(uow.session)
+    cache_repo = LeaderboardRepo(redis)
+    return LeaderboardService(uow, lb_repo, cache_repo)
 
-async def get_profile_service(uow: Annotated[UoW, Depends(get_uow)]) -> ProfileService:
+
+async def get_profile_service(
+    uow: Annotated[UoW, Depends(get_uow, scope="function")],
+    leaderboard: Annotated[LeaderboardService, Depends(get_leaderboard_service)],
+    redis: Annotated[Redis, Depends(get_redis)],
+) -> ProfileService:
     teams_repo = TeamsInterface(uow.session)
     prizes_repo = PrizesInterface(uow.session)
     inventory_repo = InventoryInterface(uow.session)
-    token_repo = TokenQRInterface(uow.session)
     games_repo = GamesInterface(uow.session)
-    return ProfileService(uow, teams_repo, inventory_repo, prizes_repo, token_repo, games_repo)
-
-
-async def get_leaderboard_service(uow: Annotated[UoW, Depends(get_uow)]) -> LeaderboardService:
-    return LeaderboardService(uow)
+    session_repo = GameSessionInterface(uow.session)
+    user_repo = UserInterface(uow.session)
+    return ProfileService(
+        uow,
+        teams_repo,
+        inventory_repo,
+        prizes_repo,
+        games_repo,
+        session_repo,
+        user_repo,
+        leaderboard,
+        redis,
+        game_catalog,
+        prize_catalog,
+    )
 
 
-async def get_admin_service(uow: Annotated[UoW, Depends(get_uow)]) -> AdminService:
-    prizes_repo = PrizesInterface(uow.session)
+async def get_admin_service(
+    uow: Annotated[UoW, Depends(get_uow, scope="function")],
+    redis: Annotated[Redis, Depends(get_redis)],
+) -> AdminService:
     inventory_repo = InventoryInterface(uow.session)
-    token_repo = TokenQRInterface(uow.session)
-    return AdminService(uow, token_repo, inventory_repo, prizes_repo)
+    token_repo = RedeemTokenRepo(redis)
+    return AdminService(uow, token_repo, inventory_repo)
 
 
-async def get_launch_service(uow: Annotated[UoW, Depends(get_uow)]) -> LaunchService:
+async def get_launch_service(
+    uow: Annotated[UoW, Depends(get_uow, scope="function")],
+    redis: Annotated[Redis, Depends(get_redis)],
+) -> LaunchService:
     launch_repo = LaunchCodeInterface(uow.session)
     session_repo = GameSessionInterface(uow.session)
-    return LaunchService(uow, launch_repo, session_repo)
+    return LaunchService(uow, launch_repo, session_repo, redis, game_catalog)
+
+
+async def rebuild_leaderboards(redis: Redis) -> None:
+    """Warms up cached leaderboards from Postgres"""
+    async with new_uow() as uow:
+        svc = LeaderboardService(uow, LeaderboardInterface(uow.session), LeaderboardRepo(redis))
+        await svc.rebuild()
+
+
+async def flush_redeem_audit(redis: Redis) -> int:
+    """
+    Copies queued redeem token events from Redis to Postgres.
+    Events are only dropped from Redis after the insert commits, so a failed
+    or interrupted run is retried with the same batch. One flusher runs at a
+    time across processes, and rows are keyed by event id, so a retried or
+    overlapping batch doesn't write duplicates.
+    """
+    token_repo = RedeemTokenRepo(redis)
+    lock = await token_repo.lock_audit(config.REDEEM_AUDIT_LOCK_SECONDS)
+    if lock is None:
+        return 0
+    try:
+        return await _flush_redeem_audit(token_repo)
+    finally:
+        await token_repo.unlock_audit(lock)
+
+
+async def _flush_redeem_audit(token_repo: RedeemTokenRepo) -> int:
+    events = await token_repo.claim_audit(config.REDEEM_AUDIT_BATCH)
+    if not events:
+        return 0
+    async with new_uow() as uow:
+        await RedeemAuditInterface(uow.session).add_many([
+            {
+                # Events queued before ids were added get a fresh one
+                "id": UUID(event["id"]) if event.get("id") else uuid4(),
+                "event": event["event"],
+                "token": event["token"],
+                "item_id": UUID(event["item_id"]),
+                "user_id": UUID(event["user_id"]),
+                "actor_id": UUID(event["actor_id"]) if event.get("actor_id") else None,
+                "occurred_at": datetime.fromisoformat(event["occurred_at"]),
+            }
+            for event in events
+        ])
+    await token_repo.ack_audit()
+    return len(events)
+
+
+async def warm_catalogs(redis: Redis) -> None:
+    """Loads the process-local catalogs so first requests don't hit Postgres"""
+    async with new_uow() as uow:
+        await game_catalog.ensure(redis, GamesInterface(uow.session))
+        await prize_catalog.ensure(redis, PrizesInterface(uow.session))
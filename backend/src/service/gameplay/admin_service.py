@@ -1,54 +1,89 @@
 from datetime import datetime, UTC
+from uuid import UUID
 from fastapi import HTTPException, status
 
-from database.relational_db import (
-    UoW,
-    TokenQRInterface,
-    InventoryInterface,
-    PrizesInterface,
-    User,
+from database.redis import RedeemTokenRepo
+from database.relational_db import UoW, InventoryInterface
+from domain.gameplay import (
+    AdminRedeemResponse,
+    AdminBatchRedeemResponse,
+    AdminRedeemResult,
+    RedeemOutcome,
 )
-from domain.gameplay import AdminRedeemResponse, ItemStatus
+from service.gameplay.utils import redeem_event
 
 
 class AdminService:
     def __init__(
         self,
         uow: UoW,
-        token_repo: TokenQRInterface,
+        token_repo: RedeemTokenRepo,
         inventory_repo: InventoryInterface,
-        prizes_repo: PrizesInterface,
     ):
         self.uow = uow
         self.token_repo = token_repo
         self.inventory_repo = inventory_repo
-        self.prizes_repo = prizes_repo
-
-    async def redeem(self, redeem_token: str) -> AdminRedeemResponse:
-        token_row = await self.token_repo.get_by_token(redeem_token)
-        if token_row is None:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Token not found")
-        if token_row.expires_at < datetime.now(UTC):
-            await self.token_repo.delete(token_row)
-            await self.uow.commit()
-            raise HTTPException(status.HTTP_410_GONE, detail="Token expired")
-
-        item = await self.inventory_repo.get_by_id(token_row.item_id)
-        if item is None:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Item not found")
-        if ItemStatus(item.status) == ItemStatus.REDEEMED:
-            await self.token_repo.delete(token_row)
-            await self.uow.commit()
+
+    async def redeem(self, redeem_token: str, actor_id: UUID | None = None) -> AdminRedeemResponse:
+        # GETDEL: whoever scans first owns the token, expired ones are already gone
+        payload = await self.token_repo.take(redeem_token)
+        if payload is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Token not found or expired")
+
+        # One statement flips AVAILABLE -> REDEEMED, so two tokens for the
+        # same item can't both succeed, and returns what the response needs
+        item_id = UUID(payload["item_id"])
+        rows = await self.inventory_repo.redeem([item_id])
+        if not rows:
+            if await self.inventory_repo.get_by_id(item_id) is None:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Item not found")
             raise HTTPException(status.HTTP_410_GONE, detail="Item already redeemed")
-        prize = await self.prizes_repo.get_by_id(item.prize_id)
-        user = await self.uow.session.get(User, item.user_id)
+        row = rows[0]
 
-        await self.inventory_repo.set_status(item.id, ItemStatus.REDEEMED.value)
-        await self.token_repo.delete(token_row)
+        event = redeem_event("redeemed", redeem_token, row.item_id, row.user_id, actor_id)
+        self.uow.on_commit(lambda: self.token_repo.audit(event))
         await self.uow.commit()
 
         return AdminRedeemResponse(
-            item_name=prize.name if prize else "Prize",
-            user_display_name=user.display_name if user else None,
+            item_name=row.prize_name,
+            user_display_name=row.display_name,
             redeemed_at=datetime.now(UTC),
         )
+
+    async def redeem_batch(self, tokens: list[str], actor_id: UUID | None = None) -> AdminBatchRedeemResponse:
+        """
+        Redeems a queue of scanned tokens: one Redis round trip for the tokens,
+        one statement for the status transitions, a lookup only for failures.
+        """
+        payloads = await self.token_repo.take_many(tokens)
+        item_ids = {UUID(payload["item_id"]) for payload in payloads if payload}
+        redeemed = {row.item_id: row for row in await self.inventory_repo.redeem(list(item_ids))}
+        missing = item_ids - redeemed.keys()
+        existing = await self.inventory_repo.existing(list(missing)) if missing else set()
+
+        results = []
+        events = []
+        for token, payload in zip(tokens, payloads):
+            if payload is None:
+                results.append(AdminRedeemResult(redeem_token=token, outcome=RedeemOutcome.TOKEN_NOT_FOUND))
+                continue
+            item_id = UUID(payload["item_id"])
+            # Several tokens for one item: the first one in the batch gets it
+            row = redeemed.pop(item_id, None)
+            if row is not None:
+                results.append(AdminRedeemResult(
+                    redeem_token=token,
+                    outcome=RedeemOutcome.REDEEMED,
+                    item_name=row.prize_name,
+                    user_display_name=row.display_name,
+                ))
+                events.append(redeem_event("redeemed", token, row.item_id, row.user_id, actor_id))
+            elif item_id in missing and item_id not in existing:
+                results.append(AdminRedeemResult(redeem_token=token, outcome=RedeemOutcome.ITEM_NOT_FOUND))
+            else:
+                results.append(AdminRedeemResult(redeem_token=token, outcome=RedeemOutcome.ALREADY_REDEEMED))
+
+        if events:
+            self.uow.on_commit(lambda: self.token_repo.audit(*events))
+        await self.uow.commit()
+        return AdminBatchRedeemResponse(results=results, redeemed_at=datetime.now(UTC))
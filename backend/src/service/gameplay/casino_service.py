@@ -1,30 +1,31 @@
-import random
-from datetime import timedelta, UTC, datetime
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from core.config import Settings
 from database.relational_db import (
     UoW,
-    User,
-    Prize,
     InventoryItem,
-    TokenQR,
     PrizesInterface,
     InventoryInterface,
-    TokenQRInterface,
+    UserInterface,
 )
+from database.redis import RedeemTokenRepo
 from domain.gameplay import (
     BetRequest,
+    Prize,
     PrizeType,
     ItemStatus,
     SpinResponse,
+    BatchSpinRequest,
+    BatchSpinResponse,
     RedeemTokenResponse,
 )
-from service.gameplay.utils import generate_qr_token
+from service.gameplay.utils import generate_qr_token, redeem_event
+from service.gameplay.catalogs import PrizeCatalog
 
 settings = Settings()  # type: ignore
 
@@ -35,40 +36,42 @@ class CasinoService:
         uow: UoW,
         prizes_repo: PrizesInterface,
         inventory_repo: InventoryInterface,
-        token_repo: TokenQRInterface,
+        token_repo: RedeemTokenRepo,
+        user_repo: UserInterface,
+        redis: Redis,
+        catalog: PrizeCatalog,
     ):
         self.uow = uow
+        self.user_repo = user_repo
         self.prizes_repo = prizes_repo
         self.inventory_repo = inventory_repo
         self.token_repo = token_repo
+        self.redis = redis
+        self.catalog = catalog
 
     async def _pick_prize(self) -> Prize:
-        prizes = await self.prizes_repo.list_all()
-        if not prizes:
+        await self.catalog.ensure(self.redis, self.prizes_repo)
+        prize = self.catalog.sample()
+        if prize is None:
             raise HTTPException(status.HTTP_409_CONFLICT, "No prizes configured")
-        return random.choice(prizes)
+        return prize
 
     async def spin(self, bet: BetRequest, user) -> SpinResponse:
-        db_user = await self.uow.session.get(User, user.id)
-        if db_user is None:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
+        prize = await self._pick_prize()
+        winnings = prize.amount if prize.type == PrizeType.MONEY else 0
 
-        if db_user.amount < bet.bet:
+        # Check and debit in one statement so parallel spins can't overdraw
+        new_amount = await self.user_repo.add_amount(user.id, winnings - bet.bet, required=bet.bet)
+        if new_amount is None:
             raise HTTPException(
                 status.HTTP_402_PAYMENT_REQUIRED,
                 detail={"error_code": "insufficient_funds", "message": "Not enough coins"},
             )
 
-        prize = await self._pick_prize()
-
-        # Apply winnings
-        if prize.type == PrizeType.MONEY:
-            db_user.amount += prize.amount - bet.bet
-        else:
-            db_user.amount -= bet.bet
+        if prize.type != PrizeType.MONEY:
             item = InventoryItem(
                 prize_id=prize.id,
-                user_id=db_user.id,
+                user_id=user.id,
                 status=ItemStatus.AVAILABLE.value,
             )
             await self.inventory_repo.add(item)
@@ -77,7 +80,36 @@ class CasinoService:
 
         return SpinResponse(
             winner=prize,
-            new_balance={"amount": db_user.amount, "currency_symbol": "❄️"},
+            new_balance={"amount": new_amount, "currency_symbol": "❄️"},
+        )
+
+    async def spin_batch(self, payload: BatchSpinRequest, user) -> BatchSpinResponse:
+        """Runs `count` spins with one balance update and one inventory insert"""
+        await self.catalog.ensure(self.redis, self.prizes_repo)
+        prizes = [self.catalog.sample() for _ in range(payload.count)]
+        if any(prize is None for prize in prizes):
+            raise HTTPException(status.HTTP_409_CONFLICT, "No prizes configured")
+
+        total_bet = payload.bet * payload.count
+        winnings = sum(prize.amount for prize in prizes if prize.type == PrizeType.MONEY)
+
+        new_amount = await self.user_repo.add_amount(user.id, winnings - total_bet, required=total_bet)
+        if new_amount is None:
+            raise HTTPException(
+                status.HTTP_402_PAYMENT_REQUIRED,
+                detail={"error_code": "insufficient_funds", "message": "Not enough coins"},
+            )
+
+        await self.inventory_repo.add_many([
+            {"prize_id": prize.id, "user_id": user.id, "status": ItemStatus.AVAILABLE.value}
+            for prize in prizes
+            if prize.type != PrizeType.MONEY
+        ])
+        await self.uow.commit()
+
+        return BatchSpinResponse(
+            winners=prizes,
+            new_balance={"amount": new_amount, "currency_symbol": "❄️"},
         )
 
     async def generate_redeem_token(self, item_id: UUID, user) -> RedeemTokenResponse:
@@ -86,14 +118,13 @@ class CasinoService:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Item not found")
         if ItemStatus(item.status) == ItemStatus.REDEEMED:
             raise HTTPException(status.HTTP_410_GONE, "Item already redeemed")
-        
+
         token_value = generate_qr_token()
-        token_row = TokenQR(
-            token=token_value,
-            user_id=user.id,
-            item_id=item_id,
-            expires_at=datetime.now(UTC) + timedelta(seconds=300),
+        ttl = settings.REDEEM_TOKEN_TTL_SECONDS
+        await self.token_repo.issue(
+            token_value,
+            {"item_id": str(item.id), "user_id": str(user.id)},
+            ttl,
+            audit=redeem_event("issued", token_value, item.id, user.id),
         )
-        await self.token_repo.add(token_row)
-        await self.uow.commit()
-        return RedeemTokenResponse(redeem_token=token_value, expires_in_seconds=300)
+        return RedeemTokenResponse(redeem_token=token_value, expires_in_seconds=ttl)
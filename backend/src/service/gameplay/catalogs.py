@@ -0,0 +1,164 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Generic, TypeVar
+import hashlib
+import logging
+import time
+from uuid import UUID
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from database.relational_db import PrizesInterface, GamesInterface
+from domain.gameplay import Prize as PrizeSchema, GameInfo
+from service.gameplay.utils import AliasSampler
+
+logger = logging.getLogger(__name__)
+
+RepoT = TypeVar("RepoT")
+
+CATALOG_CHANNEL = "catalog:invalidate"
+
+
+class Catalog(ABC, Generic[RepoT]):
+    """
+    Process-local copy of a small, rarely changing table.
+
+    Writers bump a version key in Redis and publish the catalog name on
+    CATALOG_CHANNEL, every process drops its copy when it hears about it.
+    The version key is also re-checked periodically in case a message was missed.
+    """
+    name: str
+    recheck_seconds: float = 60
+
+    def __init__(self):
+        self._loaded = False
+        self._version: str | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def version_key(self) -> str:
+        return f"catalog:{self.name}:version"
+
+    @abstractmethod
+    async def _load(self, repo: RepoT) -> None:
+        """Replaces the local copy with the current table contents"""
+
+    def invalidate_local(self) -> None:
+        self._loaded = False
+
+    async def ensure(self, redis: Redis, repo: RepoT) -> None:
+        """Reloads the catalog if it was never loaded or its version changed"""
+        if self._loaded and time.monotonic() - self._checked_at < self.recheck_seconds:
+            return
+
+        async with self._lock:
+            if self._loaded and time.monotonic() - self._checked_at < self.recheck_seconds:
+                return
+            try:
+                version = await redis.get(self.version_key)
+            except RedisError:
+                logger.warning("Failed to read %s catalog version", self.name, exc_info=True)
+                version = self._version
+
+            if not self._loaded or version != self._version:
+                await self._load(repo)
+                self._loaded = True
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    async def publish_change(self, redis: Redis) -> None:
+        """Must be called after a committed change of the underlying table"""
+        await redis.incr(self.version_key)
+        await redis.publish(CATALOG_CHANNEL, self.name)
+        self.invalidate_local()
+
+
+class PrizeCatalog(Catalog[PrizesInterface]):
+    name = "prizes"
+
+    def __init__(self):
+        super().__init__()
+        self.prizes: list[PrizeSchema] = []
+        self._by_id: dict[UUID, PrizeSchema] = {}
+        self._sampler: AliasSampler[PrizeSchema] | None = None
+
+    async def _load(self, repo: PrizesInterface) -> None:
+        rows = await repo.list_all()
+        self.prizes = [PrizeSchema.model_validate(row) for row in rows]
+        self._by_id = {prize.id: prize for prize in self.prizes}
+        weights = [max(row.weight, 0) for row in rows]
+        self._sampler = AliasSampler(self.prizes, weights) if sum(weights) > 0 else None
+
+    def sample(self) -> PrizeSchema | None:
+        if self._sampler is None:
+            return None
+        return self._sampler.sample()
+
+    def get(self, prize_id: UUID) -> PrizeSchema | None:
+        return self._by_id.get(prize_id)
+
+
+class GameCatalog(Catalog[GamesInterface]):
+    """
+    Games keyed by slug, plus the `/games` response serialised once per load.
+    The ETag is a hash of that body so every process hands out the same one.
+    Games only change through migrations, scripts.publish_catalogs announces them.
+    """
+    name = "games"
+
+    def __init__(self):
+        super().__init__()
+        self.games: list[GameInfo] = []
+        self._by_slug: dict[str, GameInfo] = {}
+        self.body = b"[]"
+        self.etag = self._etag_for(self.body)
+
+    async def _load(self, repo: GamesInterface) -> None:
+        rows = await repo.list()
+        self.games = [
+            GameInfo(slug=row.slug, name=row.name, energy_cost=row.energy_cost)
+            for row in rows
+        ]
+        self._by_slug = {game.slug: game for game in self.games}
+        self.body = TypeAdapter(list[GameInfo]).dump_json(self.games)
+        self.etag = self._etag_for(self.body)
+
+    @staticmethod
+    def _etag_for(body: bytes) -> str:
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def get(self, slug: str) -> GameInfo | None:
+        return self._by_slug.get(slug)
+
+
+prize_catalog = PrizeCatalog()
+game_catalog = GameCatalog()
+
+CATALOGS: dict[str, Catalog] = {
+    prize_catalog.name: prize_catalog,
+    game_catalog.name: game_catalog,
+}
+
+
+async def listen_for_invalidations(redis: Redis) -> None:
+    """Drops local catalog copies when another process reports a change"""
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(CATALOG_CHANNEL)
+            # Anything published while we were not subscribed has to be reloaded
+            for catalog in CATALOGS.values():
+                catalog.invalidate_local()
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                catalog = CATALOGS.get(message["data"])
+                if catalog is not None:
+                    catalog.invalidate_local()
+        except RedisError:
+            logger.warning("Catalog invalidation listener disconnected", exc_info=True)
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
@@ -3,6 +3,7 @@ from datetime import datetime, UTC, timedelta
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from redis.asyncio import Redis
 
 from core.config import Settings
 from database.relational_db import (
@@ -14,6 +15,8 @@ from database.relational_db import (
     User,
     GamesInterface,
 )
+from domain.auth import Principal
+from service.gameplay.catalogs import GameCatalog, game_catalog
 
 settings = Settings()  # pyright: ignore[reportCallIssue]
 
@@ -24,18 +27,23 @@ class LaunchService:
         uow: UoW,
         launch_repo: LaunchCodeInterface,
         session_repo: GameSessionInterface,
+        redis: Redis,
+        game_catalog: GameCatalog,
     ):
         self.uow = uow
         self.launch_repo = launch_repo
         self.session_repo = session_repo
         self.games_repo = GamesInterface(uow.session)
+        self.redis = redis
+        self.game_catalog = game_catalog
 
-    async def create_launch(self, user: User, game_id: str) -> tuple[str, UUID]:
+    async def create_launch(self, user: Principal, game_id: str) -> tuple[str, UUID]:
         """
         Creates a game session and one-time launch code.
         Returns launch_code and session_id.
         """
-        game = await self.games_repo.get_by_slug(game_id)
+        await self.game_catalog.ensure(self.redis, self.games_repo)
+        game = self.game_catalog.get(game_id)
         if game is None:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Unknown game")
 
@@ -76,11 +84,13 @@ class LaunchService:
 # Dependency
 from typing import Annotated
 from fastapi import Depends
+from database.redis import get_redis
 from database.relational_db import get_uow
 
 async def get_launch_service(
-    uow: Annotated[UoW, Depends(get_uow)],
+    uow: Annotated[UoW, Depends(get_uow, scope="function")],
+    redis: Annotated[Redis, Depends(get_redis)],
 ) -> LaunchService:
     launch_repo = LaunchCodeInterface(uow.session)
     session_repo = GameSessionInterface(uow.session)
-    return LaunchService(uow, launch_repo, session_repo)
+    return LaunchService(uow, launch_repo, session_repo, redis, game_catalog)
@@ -1,34 +1,231 @@
-from typing import Sequence
+import logging
+from datetime import datetime, UTC
+from uuid import UUID
 from fastapi import HTTPException
-from sqlalchemy import select
+from redis.exceptions import RedisError
 
-from database.relational_db import UoW, User, Team
-from domain.gameplay import LeaderboardType, LeaderboardEntry, Trend
+from database.redis import LeaderboardRepo
+from database.relational_db import UoW, User, Team, LeaderboardInterface, new_uow
+from domain.gameplay import LeaderboardType, LeaderboardEntry, LeaderboardPage, Trend
+from domain.auth import Principal
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for loading and swapping in one board
+REBUILD_LOCK_SECONDS = 60
+
+BOARD_MODELS: dict[LeaderboardType, type[User] | type[Team]] = {
+    LeaderboardType.PLAYERS: User,
+    LeaderboardType.DEPARTMENTS: Team,
+}
+
+
+def player_name(user: User) -> str:
+    return user.display_name or user.username or "Player"
 
 
 class LeaderboardService:
-    def __init__(self, uow: UoW):
+    """
+    Serves leaderboards from Redis sorted sets, falling back
+    to window-function queries when Redis is unavailable.
+    """
+    def __init__(self, uow: UoW, lb_repo: LeaderboardInterface, cache_repo: LeaderboardRepo):
         self.uow = uow
+        self.lb_repo = lb_repo
+        self.cache_repo = cache_repo
 
-    async def _players(self) -> list[LeaderboardEntry]:
-        users = await self.uow.session.scalars(select(User))
-        ranked = sorted(users.all(), key=lambda u: u.score, reverse=True)
-        return [
-            LeaderboardEntry(rank=i + 1, name=u.display_name or u.username or "Player", score=u.score, trend=Trend.SAME)
-            for i, u in enumerate(ranked)
-        ]
+    @staticmethod
+    def _model(lb_type: LeaderboardType) -> type[User] | type[Team]:
+        model = BOARD_MODELS.get(lb_type)
+        if model is None:
+            raise HTTPException(400, "Unknown leaderboard type")
+        return model
+
+    async def rebuild(self, lb_type: LeaderboardType | None = None) -> None:
+        """Reloads cached boards from Postgres"""
+        for board in [lb_type] if lb_type else list(LeaderboardType):
+            await self._rebuild(board)
+
+    async def _rebuild(self, board: LeaderboardType) -> bool:
+        """
+        Reloads one board, returns False if another rebuild of it is running.
+        Totals are always read from the primary, a lagging replica would put
+        stale scores back until the next rebuild.
+        """
+        token = await self.cache_repo.begin_rebuild(board.value, REBUILD_LOCK_SECONDS)
+        if token is None:
+            return False
+        try:
+            async with new_uow() as uow:
+                rows = await LeaderboardInterface(uow.session).scores(self._model(board))
+            return await self.cache_repo.finish_rebuild(
+                board.value,
+                token,
+                ((str(row.id), row.name, row.score) for row in rows),
+            )
+        except BaseException:
+            await self.cache_repo.abort_rebuild(board.value, token)
+            raise
+
+    async def snapshot(self) -> None:
+        """Stores current ranks of every board, used as the baseline for trends"""
+        taken_at = datetime.now(UTC)
+        for board in LeaderboardType:
+            await self.lb_repo.take_snapshot(self._model(board), board.value, taken_at)
+        await self.uow.commit()
+
+    async def _with_trends(
+        self,
+        lb_type: LeaderboardType,
+        rows: list[tuple[str, LeaderboardEntry]],
+    ) -> list[tuple[str, LeaderboardEntry]]:
+        previous = await self.lb_repo.snapshot_ranks(
+            lb_type.value, (UUID(member) for member, _ in rows)
+        )
+        for member, entry in rows:
+            before = previous.get(UUID(member))
+            if before is None or before == entry.rank:
+                entry.trend = Trend.SAME
+            else:
+                entry.trend = Trend.UP if entry.rank < before else Trend.DOWN
+        return rows
+
+    async def _ensure_cached(self, lb_type: LeaderboardType) -> bool:
+        """Whether the cached board can be read, it is rebuilt first if missing"""
+        if await self.cache_repo.exists(lb_type.value):
+            return True
+        return await self._rebuild(lb_type)
+
+    async def record_score(self, user: User, team: Team | None) -> None:
+        """
+        Mirrors already committed score totals into the cached boards.
+        Scores only grow, so writing totals (never lowered) instead of deltas
+        makes late or repeated writes harmless.
+        Boards that aren't cached are skipped, the next read rebuilds them from Postgres.
+        """
+        try:
+            await self.cache_repo.set_score(
+                LeaderboardType.PLAYERS.value, str(user.id), user.score, player_name(user)
+            )
+            if team is not None:
+                await self.cache_repo.set_score(
+                    LeaderboardType.DEPARTMENTS.value, str(team.id), team.score, team.name
+                )
+        except RedisError:
+            # Board will be rebuilt from Postgres once Redis is back
+            logger.warning("Failed to record score in leaderboard cache", exc_info=True)
 
-    async def _departments(self) -> list[LeaderboardEntry]:
-        teams = await self.uow.session.scalars(select(Team))
-        ranked = sorted(teams.all(), key=lambda t: t.score, reverse=True)
-        return [
-            LeaderboardEntry(rank=i + 1, name=t.name, score=t.score, trend=Trend.SAME)
-            for i, t in enumerate(ranked)
+    async def rename(self, lb_type: LeaderboardType, member_id: UUID, name: str) -> None:
+        try:
+            await self.cache_repo.set_name(lb_type.value, str(member_id), name)
+        except RedisError:
+            logger.warning("Failed to rename leaderboard member", exc_info=True)
+
+    async def _rows(
+        self,
+        lb_type: LeaderboardType,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[tuple[str, LeaderboardEntry]]:
+        """Returns (member_id, entry) pairs ordered by score desc"""
+        try:
+            if await self._ensure_cached(lb_type):
+                cached = await self.cache_repo.page(lb_type.value, offset, limit)
+                rows = [
+                    (member, LeaderboardEntry(rank=rank, name=name or "Player", score=score))
+                    for member, name, score, rank in cached
+                ]
+                return await self._with_trends(lb_type, rows)
+        except RedisError:
+            logger.warning("Leaderboard cache unavailable, using SQL ranking", exc_info=True)
+        return await self._sql_rows(lb_type, offset, limit)
+
+    async def _sql_rows(
+        self,
+        lb_type: LeaderboardType,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[tuple[str, LeaderboardEntry]]:
+        ranked = await self.lb_repo.page(self._model(lb_type), offset, limit)
+        rows = [
+            (str(row.id), LeaderboardEntry(rank=row.rank, name=row.name, score=row.score))
+            for row in ranked
         ]
+        return await self._with_trends(lb_type, rows)
+
+    async def page(
+        self,
+        lb_type: LeaderboardType,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[LeaderboardEntry]:
+        return [entry for _, entry in await self._rows(lb_type, offset, limit)]
+
+    async def rank_of(self, lb_type: LeaderboardType, member_id: UUID) -> tuple[int, int, int] | None:
+        """Returns (position, rank, score) of a player or team"""
+        ranked, _ = await self._locate(lb_type, member_id)
+        return ranked
+
+    async def _locate(
+        self,
+        lb_type: LeaderboardType,
+        member_id: UUID,
+    ) -> tuple[tuple[int, int, int] | None, bool]:
+        """`rank_of` plus whether it came from the cached board rather than SQL"""
+        model = self._model(lb_type)
+        try:
+            if await self._ensure_cached(lb_type):
+                cached = await self.cache_repo.rank_of(lb_type.value, str(member_id))
+                if cached is not None:
+                    return cached, True
+        except RedisError:
+            logger.warning("Leaderboard cache unavailable, using SQL ranking", exc_info=True)
+
+        # Members who never scored may be missing from the cache until the next rebuild
+        row = await self.lb_repo.rank_of(model, member_id)
+        if row is None:
+            return None, False
+        return (row.position, row.rank, row.score), False
+
+    async def get(self, lb_type: LeaderboardType, limit: int | None = None) -> list[LeaderboardEntry]:
+        return await self.page(lb_type, limit=limit)
+
+    async def get_page(
+        self,
+        lb_type: LeaderboardType,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> LeaderboardPage:
+        offset = 0
+        if cursor:
+            try:
+                offset = int(cursor)
+                if offset < 0:
+                    raise ValueError(cursor)
+            except ValueError:
+                raise HTTPException(400, detail="Invalid cursor")
+
+        items = await self.page(lb_type, offset, limit)
+        next_cursor = str(offset + limit) if len(items) == limit else None
+        return LeaderboardPage(items=items, next_cursor=next_cursor)
+
+    async def around(self, lb_type: LeaderboardType, user: Principal, neighbours: int) -> LeaderboardPage:
+        """Returns the caller's entry with up to `neighbours` entries above and below it"""
+        member_id = user.id if lb_type == LeaderboardType.PLAYERS else user.team_id
+        if member_id is None:
+            return LeaderboardPage(items=[], next_cursor=None)
+
+        ranked, cached = await self._locate(lb_type, member_id)
+        if ranked is None:
+            return LeaderboardPage(items=[], next_cursor=None)
+
+        position, _, _ = ranked
+        offset = max(0, position - neighbours)
+        limit = position - offset + neighbours + 1
+        # The position only means something in the ranking it came from, a member
+        # missing from the cached board is ranked by SQL, so its neighbours are too
+        rows = await (self._rows if cached else self._sql_rows)(lb_type, offset, limit)
 
-    async def get(self, lb_type: LeaderboardType) -> list[LeaderboardEntry]:
-        if lb_type == LeaderboardType.PLAYERS:
-            return await self._players()
-        if lb_type == LeaderboardType.DEPARTMENTS:
-            return await self._departments()
-        raise HTTPException(400, "Unknown leaderboard type")
+        me = next((entry for member, entry in rows if member == str(member_id)), None)
+        next_cursor = str(offset + limit) if len(rows) == limit else None
+        return LeaderboardPage(items=[entry for _, entry in rows], next_cursor=next_cursor, me=me)
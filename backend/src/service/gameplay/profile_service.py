@@ -1,20 +1,25 @@
+import base64
 from datetime import datetime
+from typing import Iterable
 from uuid import UUID
 from fastapi import HTTPException, status
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from database.relational_db import (
     UoW,
     User,
-    InventoryItem,
     TeamsInterface,
     InventoryInterface,
     PrizesInterface,
-    TokenQRInterface,
     GamesInterface,
+    GameSessionInterface,
+    GameSession,
+    UserInterface,
 )
 from domain.gameplay import (
+    LeaderboardType,
     ProfileResponse,
     ProfilePatch,
     Balance,
@@ -23,13 +28,34 @@ from domain.gameplay import (
     GameScoreRequest,
     GameScoreResponse,
     ItemStatus,
-    PrizeType,
     UserSummary,
     EnergyState,
     InventoryItem as InventoryItemSchema,
+    InventoryPage,
+    InventoryGroup,
+    InventorySummary,
     GameInfo,
 )
-from service.gameplay.utils import refill_energy
+from domain.auth import Principal
+from service.gameplay.utils import now_utc
+from utils.energy import refill_energy, ENERGY_MAX, ENERGY_REFILL_SECONDS
+from service.gameplay.leaderboard_service import LeaderboardService, player_name
+from service.gameplay.catalogs import GameCatalog, PrizeCatalog
+
+PROFILE_INVENTORY_PREVIEW = 50
+
+
+def _encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """base64url without padding, so it survives a query string without encoding"""
+    raw = f"{created_at.isoformat()}_{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    ts_str, id_str = raw.split("_", 1)
+    return datetime.fromisoformat(ts_str), UUID(id_str)
+
 
 class ProfileService:
     def __init__(
@@ -38,44 +64,53 @@ class ProfileService:
         teams_repo: TeamsInterface,
         inventory_repo: InventoryInterface,
         prizes_repo: PrizesInterface,
-        token_repo: TokenQRInterface,
         games_repo: GamesInterface,
+        session_repo: GameSessionInterface,
+        user_repo: UserInterface,
+        leaderboard: LeaderboardService,
+        redis: Redis,
+        game_catalog: GameCatalog,
+        prize_catalog: PrizeCatalog,
     ):
         self.uow = uow
         self.teams_repo = teams_repo
         self.inventory_repo = inventory_repo
         self.prizes_repo = prizes_repo
-        self.token_repo = token_repo
         self.games_repo = games_repo
+        self.session_repo = session_repo
+        self.user_repo = user_repo
+        self.leaderboard = leaderboard
+        self.redis = redis
+        self.game_catalog = game_catalog
+        self.prize_catalog = prize_catalog
 
-    async def _load_user(self, user_id: UUID) -> User:
-        user = await self.uow.session.scalar(
-            select(User)
-            .options(
-                selectinload(User.team),
-                selectinload(User.items).selectinload(InventoryItem.prize),
-            )
-            .where(User.id == user_id)
-        )
+    async def _load_user(self, user_id: UUID, with_team: bool = False) -> User:
+        stmt = select(User).where(User.id == user_id)
+        if with_team:
+            stmt = stmt.options(selectinload(User.team))
+        user = await self.uow.session.scalar(stmt)
         if user is None:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
         return user
 
-    async def _get_game(self, game_slug: str | None, allow_default: bool = True):
+    async def _get_game(self, game_slug: str | None, allow_default: bool = True) -> GameInfo:
+        await self.game_catalog.ensure(self.redis, self.games_repo)
         if game_slug:
-            game = await self.games_repo.get_by_slug(game_slug)
+            game = self.game_catalog.get(game_slug)
             if game is None:
                 raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Unknown game")
             return game
         if not allow_default:
             raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="game_id is required")
-        games = await self.games_repo.list()
-        if not games:
+        if not self.game_catalog.games:
             raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="No games configured")
-        return games[0]
+        return self.game_catalog.games[0]
 
-    async def get_profile(self, user: User) -> ProfileResponse:
-        db_user = await self._load_user(user.id)
+    async def get_profile(self, user: Principal) -> ProfileResponse:
+        db_user = await self._load_user(user.id, with_team=True)
+        counts = await self.inventory_repo.count_by_status(db_user.id)
+        # Bounded so heavy players don't make the profile slower with every spin
+        preview = await self.get_inventory(user, limit=PROFILE_INVENTORY_PREVIEW)
         return ProfileResponse(
             id=db_user.id,
             username=db_user.username,
@@ -85,45 +120,120 @@ class ProfileService:
             level=db_user.level,
             xp=db_user.score,
             max_xp=db_user.max_score,
-            inventory=[
+            inventory=preview.items,
+            inventory_next_cursor=preview.next_cursor,
+            inventory_summary=InventorySummary(
+                available=counts.get(ItemStatus.AVAILABLE.value, 0),
+                redeemed=counts.get(ItemStatus.REDEEMED.value, 0),
+            ),
+        )
+
+    async def _ensure_prizes(self, prize_ids: Iterable[UUID]) -> None:
+        """Prize data comes from the catalog, reloaded once if a prize is newer than it"""
+        await self.prize_catalog.ensure(self.redis, self.prizes_repo)
+        if any(self.prize_catalog.get(prize_id) is None for prize_id in prize_ids):
+            self.prize_catalog.invalidate_local()
+            await self.prize_catalog.ensure(self.redis, self.prizes_repo)
+
+    async def get_inventory(
+        self,
+        user: Principal,
+        status: ItemStatus = ItemStatus.AVAILABLE,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> InventoryPage:
+        cursor_created_at = None
+        cursor_id = None
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = _decode_cursor(cursor)
+            except (ValueError, TypeError):
+                raise HTTPException(400, detail="Invalid cursor")
+
+        items = await self.inventory_repo.page(
+            user.id,
+            status.value,
+            limit=limit,
+            cursor_created_at=cursor_created_at,
+            cursor_id=cursor_id,
+        )
+
+        await self._ensure_prizes(item.prize_id for item in items)
+
+        page = []
+        for item in items:
+            prize = self.prize_catalog.get(item.prize_id)
+            if prize is None:
+                continue
+            page.append(
                 InventoryItemSchema(
                     id=item.id,
                     prize_id=item.prize_id,
-                    name=item.prize.name,
-                    type=PrizeType(item.prize.type),
+                    name=prize.name,
+                    type=prize.type,
                     status=ItemStatus(item.status),
-                    amount=item.prize.amount,
-                    emoji=item.prize.emoji,
-                    color_hex=item.prize.color_hex,
+                    amount=prize.amount,
+                    emoji=prize.emoji,
+                    color_hex=prize.color_hex,
                 )
-                for item in db_user.items
-                if ItemStatus(item.status) == ItemStatus.AVAILABLE
-            ],
-        )
+            )
+
+        next_cursor = None
+        if len(items) == limit:
+            last = items[-1]
+            next_cursor = _encode_cursor(last.created_at, last.id)
+        return InventoryPage(items=page, next_cursor=next_cursor)
+
+    async def get_inventory_groups(
+        self,
+        user: Principal,
+        status: ItemStatus | None = None,
+    ) -> list[InventoryGroup]:
+        """Item counts per prize, sized by distinct prizes rather than items"""
+        rows = await self.inventory_repo.grouped(user.id, status.value if status else None)
+        await self._ensure_prizes(row.prize_id for row in rows)
 
-    async def patch_profile(self, payload: ProfilePatch, user: User) -> ProfileResponse:
+        groups = []
+        for row in rows:
+            prize = self.prize_catalog.get(row.prize_id)
+            if prize is None:
+                continue
+            groups.append(
+                InventoryGroup(
+                    prize_id=row.prize_id,
+                    name=prize.name,
+                    type=prize.type,
+                    status=ItemStatus(row.status),
+                    amount=prize.amount,
+                    emoji=prize.emoji,
+                    color_hex=prize.color_hex,
+                    count=row.count,
+                )
+            )
+        return groups
+
+    async def patch_profile(self, payload: ProfilePatch, user: Principal) -> ProfileResponse:
         db_user = await self._load_user(user.id)
         data = payload.model_dump(exclude_none=True)
         if "avatar_url" in data:
             db_user.url = data.pop("avatar_url")
         for key, value in data.items():
             setattr(db_user, key, value)
+        if "display_name" in data:
+            name = player_name(db_user)
+            self.uow.on_commit(lambda: self.leaderboard.rename(LeaderboardType.PLAYERS, db_user.id, name))
         await self.uow.commit()
-        await self.uow.session.refresh(db_user)
         return await self.get_profile(db_user)
 
-    async def balance(self, user: User) -> Balance:
+    async def balance(self, user: Principal) -> Balance:
         db_user = await self._load_user(user.id)
         return Balance(amount=db_user.amount, currency_symbol="❄️")
 
-    async def main(self, user: User) -> MainResponse:
+    async def main(self, user: Principal) -> MainResponse:
         db_user = await self._load_user(user.id)
-        games = await self.games_repo.list()
-        new_energy, next_refill = refill_energy(db_user.energy, db_user.updated_at)
-        if new_energy != db_user.energy:
-            db_user.energy = new_energy
-            await self.uow.commit()
-            await self.uow.session.refresh(db_user)
+        await self.game_catalog.ensure(self.redis, self.games_repo)
+        # Read-only: regenerated energy is only written when it is spent
+        energy, next_refill = refill_energy(db_user.energy, db_user.energy_updated_at)
 
         return MainResponse(
             user_summary=UserSummary(
@@ -131,36 +241,31 @@ class ProfileService:
                 display_name=db_user.display_name or db_user.username,
                 balance=Balance(amount=db_user.amount, currency_symbol="❄️"),
                 energy=EnergyState(
-                    current=db_user.energy,
-                    max=10,
+                    current=energy,
+                    max=ENERGY_MAX,
                     next_refill_in_seconds=next_refill,
                 ),
             ),
-            games=[GameInfo(slug=g.slug, name=g.name, energy_cost=g.energy_cost) for g in games],
+            games=self.game_catalog.games,
             # quests=[],
         )
 
-    async def apply_game_start(self, user: User, game_id: str | None = None) -> GameStartResponse:
-        db_user = await self._load_user(user.id)
+    async def apply_game_start(self, user: Principal, game_id: str | None = None) -> GameStartResponse:
         game = await self._get_game(game_id)
-        if db_user.energy < game.energy_cost:
+        # Check and take energy in one statement, no need to load the user
+        energy_left = await self.user_repo.spend_energy(
+            user.id, game.energy_cost, now_utc(), ENERGY_MAX, ENERGY_REFILL_SECONDS
+        )
+        if energy_left is None:
             raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Not enough energy")
-        db_user.energy -= game.energy_cost
-        await self.uow.commit()
-        await self.uow.session.refresh(db_user)
-        from database.relational_db import GameSessionInterface, GameSession  # local import to avoid cycle
 
-        session_repo = GameSessionInterface(self.uow.session)
-        session_obj = GameSession(user_id=db_user.id, game_id=game.slug, energy_cost=game.energy_cost)
-        await session_repo.add(session_obj)
+        session_obj = GameSession(user_id=user.id, game_id=game.slug, energy_cost=game.energy_cost)
+        await self.session_repo.add(session_obj)
         await self.uow.commit()
-        return GameStartResponse(session_id=session_obj.id, energy_left=db_user.energy)
-
-    async def apply_game_score(self, user: User, payload: GameScoreRequest) -> GameScoreResponse:
-        from database.relational_db import GameSessionInterface
+        return GameStartResponse(session_id=session_obj.id, energy_left=energy_left)
 
-        session_repo = GameSessionInterface(self.uow.session)
-        session = await session_repo.get(payload.session_id)
+    async def apply_game_score(self, user: Principal, payload: GameScoreRequest) -> GameScoreResponse:
+        session = await self.session_repo.get(payload.session_id)
         if session is None or session.user_id != user.id:
             raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Session not found")
 
@@ -170,6 +275,7 @@ class ProfileService:
         db_user = await self._load_user(user.id)
 
         db_user.score += payload.score
+        team = None
         if db_user.team_id:
             team = await self.teams_repo.get(db_user.team_id)
             if team:
@@ -181,6 +287,7 @@ class ProfileService:
         else:
             total_team_score = None
 
+        self.uow.on_commit(lambda: self.leaderboard.record_score(db_user, team))
         await self.uow.commit()
         return GameScoreResponse(
             team_score_added=payload.score,
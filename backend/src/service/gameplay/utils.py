@@ -1,35 +1,78 @@
 import random
+import secrets
 import string
 from datetime import datetime, UTC
+from typing import Generic, Sequence, TypeVar
+from uuid import UUID, uuid4
+
+T = TypeVar("T")
+_rng = random.Random()
 
 
 def generate_qr_token(length: int = 10) -> str:
+    # The token alone authorises a redeem, so it must not be guessable
     alphabet = string.ascii_letters + string.digits
-    return "".join(random.choices(alphabet, k=length))
+    return "".join(secrets.choice(alphabet) for _ in range(length))
 
 
 def now_utc() -> datetime:
     return datetime.now(UTC)
 
 
-def refill_energy(
-    current_energy: int,
-    updated_at: datetime | None,
-    max_energy: int = 10,
-    seconds_per_point: int = 300,
-) -> tuple[int, int]:
+def redeem_event(
+    event: str,
+    token: str,
+    item_id: UUID,
+    user_id: UUID,
+    actor_id: UUID | None = None,
+) -> dict:
+    """Audit record of a redeem token, queued in Redis until it's written to Postgres"""
+    return {
+        "id": str(uuid4()),
+        "event": event,
+        "token": token,
+        "item_id": str(item_id),
+        "user_id": str(user_id),
+        "actor_id": str(actor_id) if actor_id else None,
+        "occurred_at": now_utc().isoformat(),
+    }
+
+
+class AliasSampler(Generic[T]):
     """
-    Refill energy based on time passed since updated_at.
-    Returns tuple of (new_energy, seconds_until_next_refill).
+    Weighted random choice in O(1) per draw (Vose's alias method).
+    Building the tables is O(n), so instances are meant to be reused.
     """
-    if updated_at is None:
-        return current_energy, 0
-
-    now = now_utc()
-    elapsed = int((now - updated_at).total_seconds())
-    gained = elapsed // seconds_per_point
-    new_energy = min(max_energy, current_energy + gained)
-    if new_energy >= max_energy:
-        return max_energy, 0
-    seconds_until_next = seconds_per_point - (elapsed % seconds_per_point)
-    return new_energy, seconds_until_next
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if not items or len(items) != len(weights):
+            raise ValueError("Items and weights must be non-empty and of equal length")
+        if any(w < 0 for w in weights) or sum(weights) <= 0:
+            raise ValueError("Weights must be non-negative with a positive sum")
+
+        n = len(items)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self._items = list(items)
+        self._prob = [0.0] * n
+        self._alias = [0] * n
+
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1
+            (small if scaled[l] < 1 else large).append(l)
+
+        # Leftovers are 1 up to float rounding
+        for i in large + small:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def sample(self, rng: random.Random | None = None) -> T:
+        rng = rng or _rng
+        i = rng.randrange(len(self._items))
+        return self._items[i] if rng.random() < self._prob[i] else self._items[self._alias[i]]
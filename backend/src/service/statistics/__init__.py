@@ -13,7 +13,7 @@ from .statistics_service import StatService
 
 
 async def get_stats_service(
-    uow: UoW = Depends(get_uow),
+    uow: UoW = Depends(get_uow, scope="function"),
 ) -> StatService:
     bv_repo = BookEventsInterface(uow.session)
     ui_repo = UserInterestInterface(uow.session)
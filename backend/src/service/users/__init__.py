@@ -12,7 +12,7 @@ from .user_service import UserService
 
 
 async def get_user_service(
-    uow: UoW = Depends(get_uow),
+    uow: UoW = Depends(get_uow, scope="function"),
     redis = Depends(get_redis),
 ) -> UserService:
     user_repo = UserInterface(uow.session)
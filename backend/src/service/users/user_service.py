@@ -5,11 +5,19 @@ from datetime import datetime
 from uuid import UUID, uuid4
 from pathlib import Path
 from fastapi import UploadFile, status, HTTPException
+from sqlalchemy.orm.attributes import set_committed_value
 
 from core.config import Settings
 # from core.rbac import permissions_cache_key
+from core.rbac import (
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_LOCAL_TTL_SECONDS,
+    principal_cache_key,
+    principal_stamp_key,
+)
 from database.redis import CacheRepo
-from domain.users import UserPatch
+from domain.auth import Principal
+from domain.users import UserModel, UserPatch
 from database.relational_db import (
     # LanguagesInterface,
     RolesInterface,
@@ -18,9 +26,14 @@ from database.relational_db import (
     User,
     Role,
 )
+from utils.energy import refill_energy
+from utils.ttl_cache import TTLCache
 
 settings = Settings()  # type: ignore
 
+# Process-wide L1 in front of the Redis principal cache
+_principals: TTLCache[Principal] = TTLCache(maxsize=10_000)
+
 
 class UserService:
     def __init__(
@@ -39,6 +52,72 @@ class UserService:
         
     async def get_user(self, user_id: UUID | str) -> User | None:
         return await self.user_repo.get_by_id(user_id)
+
+    @staticmethod
+    def to_model(user: User) -> UserModel:
+        """The column only holds energy as of energy_updated_at, report it as of now like /main does"""
+        energy, _ = refill_energy(user.energy, user.energy_updated_at)
+        return UserModel.model_validate(user).model_copy(update={"energy": energy})
+
+    async def get_principal(
+        self,
+        user_id: UUID | str,
+        auth_version: int | None = None,
+    ) -> Principal | None:
+        """
+        Resolves the principal from the in-process cache, then Redis, then Postgres.
+        Cache entries are keyed by the token's auth version, so bumping the
+        version (ban, role change) makes old entries unreachable for new tokens.
+        A row loaded from Postgres is only cached if the user's stamp did not
+        change meanwhile, otherwise a request that read it before a ban or team
+        change committed would put the old principal back.
+        """
+        stamp_key = principal_stamp_key(user_id)
+        stamp = None
+        if auth_version is not None:
+            cache_key = principal_cache_key(user_id, auth_version)
+            principal = _principals.get(cache_key)
+            if principal is not None:
+                return principal
+
+            if self.cache_repo:
+                cached, stamp = await self.cache_repo.get_stamped(cache_key, stamp_key)
+                if cached is not None:
+                    principal = Principal.model_validate_json(cached)
+                    _principals.set(cache_key, principal, PRINCIPAL_LOCAL_TTL_SECONDS)
+                    return principal
+        elif self.cache_repo:
+            stamp = await self.cache_repo.stamp(stamp_key)
+
+        row = await self.user_repo.get_principal(user_id)
+        if row is None:
+            return None
+
+        principal = Principal(
+            id=row.id,
+            banned=row.banned,
+            auth_version=row.auth_version,
+            team_id=row.team_id,
+            role_slugs=list(row.role_slugs or []),
+        )
+        cache_key = principal_cache_key(user_id, principal.auth_version)
+        if self.cache_repo and stamp is not None:
+            stored = await self.cache_repo.set_if_stamp(
+                cache_key, principal.model_dump_json(), stamp_key, stamp, PRINCIPAL_CACHE_TTL_SECONDS
+            )
+            if not stored:
+                return principal
+        _principals.set(cache_key, principal, PRINCIPAL_LOCAL_TTL_SECONDS)
+        return principal
+
+    async def _invalidate_principal(self, user_id: UUID | str, version: int | None) -> None:
+        cache_keys = [principal_cache_key(user_id, version)] if version is not None else []
+        for cache_key in cache_keys:
+            _principals.delete(cache_key)
+        if self.cache_repo:
+            await self.cache_repo.bump_stamp(
+                principal_stamp_key(user_id), PRINCIPAL_CACHE_TTL_SECONDS, *cache_keys
+            )
         
     async def patch_user(self, payload: UserPatch, user: User):
         data = payload.model_dump(exclude_none=True)
@@ -47,13 +126,12 @@ class UserService:
             setattr(user, field, value)
             
         await self.uow.commit()
-            
-        await self.uow.session.refresh(user)
 
     async def set_team(self, user: User, team_id: UUID | None):
         user.team_id = team_id
+        version = user.auth_version
+        self.uow.on_commit(lambda: self._invalidate_principal(user.id, version))
         await self.uow.commit()
-        await self.uow.session.refresh(user)
 
     async def add_picture(
         self,
@@ -140,9 +218,9 @@ class UserService:
         previous_version = target.auth_version
         target.banned = banned
         target.bump_auth_version()
-        await self.uow.commit()
-        await self.uow.session.refresh(target)
         # await self._invalidate_permissions_cache(target.id, previous_version)
+        self.uow.on_commit(lambda: self._invalidate_principal(target.id, previous_version))
+        await self.uow.commit()
         return target
 
     # async def list_languages(self, search: str, limit: int):
@@ -167,10 +245,12 @@ class UserService:
         previous_version = target.auth_version
         await self.user_repo.assign_roles(target, roles)
         target.bump_auth_version()
-        await self.uow.commit()
-        await self.uow.session.refresh(target)
+        # Roles were replaced with plain DML, set the collection instead of reloading it
+        set_committed_value(target, "roles", roles)
 
         # await self._invalidate_permissions_cache(target.id, previous_version)
+        self.uow.on_commit(lambda: self._invalidate_principal(target.id, previous_version))
+        await self.uow.commit()
         return target
 
     # async def _invalidate_permissions_cache(
@@ -0,0 +1,28 @@
+from datetime import datetime, UTC
+
+ENERGY_MAX = 10
+ENERGY_REFILL_SECONDS = 300
+
+
+def refill_energy(
+    current_energy: int,
+    updated_at: datetime | None,
+    max_energy: int = ENERGY_MAX,
+    seconds_per_point: int = ENERGY_REFILL_SECONDS,
+) -> tuple[int, int]:
+    """
+    Computes energy from the value stored at `updated_at` (the energy anchor)
+    and the time passed since then, nothing is written back.
+    Returns tuple of (new_energy, seconds_until_next_refill).
+    """
+    if updated_at is None:
+        return current_energy, 0
+
+    now = datetime.now(UTC)
+    elapsed = max(0, int((now - updated_at).total_seconds()))
+    gained = elapsed // seconds_per_point
+    new_energy = min(max_energy, current_energy + gained)
+    if new_energy >= max_energy:
+        return max_energy, 0
+    seconds_until_next = seconds_per_point - (elapsed % seconds_per_point)
+    return new_energy, seconds_until_next